@@ -1,15 +0,0 @@
-"""MCP (Model Context Protocol) Server Service."""
-
-from .server import MCPServer, app
-from .tools import get_available_tools
-from .database import get_vector_store, get_mongodb_store
-from .config import config
-
-__all__ = [
-    "MCPServer",
-    "app",
-    "get_available_tools",
-    "get_vector_store",
-    "get_mongodb_store",
-    "config"
-] 
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Request coalescing for embedding, ingestion, and vector store writes."""
+
+import asyncio
+import logging
+import sys
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from qdrant_client.models import PointStruct, SearchRequest
+
+# Add the current directory to Python path for imports
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from database import get_vector_store
+    from embeddings import embed_texts
+    from embeddings_cache import get_cached_embedding, get_persisted_embedding, put_cached_embeddings
+except ImportError:
+    # Try relative imports if running as module
+    from .database import get_vector_store
+    from .embeddings import embed_texts
+    from .embeddings_cache import get_cached_embedding, get_persisted_embedding, put_cached_embeddings
+
+logger = logging.getLogger(__name__)
+
+class AsyncBatcher:
+    """
+    Collect items submitted within a short window and process them together.
+
+    A batch is flushed when it reaches `max_batch_size` items or when
+    `max_wait_ms` has passed since its first item, whichever comes first.
+    Each caller awaits the result for its own item.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 20):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the pending items to a background task."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Process one batch and resolve every caller's future."""
+        items = [item for item, _ in batch]
+        try:
+            results = await self.process_batch(items)
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(items)} items: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def process_batch(self, items: List[Any]) -> List[Any]:
+        """Process a batch of items, returning one result per item in order."""
+        raise NotImplementedError
+
+class EmbedBatcher(AsyncBatcher):
+    """Coalesce embedding requests into multi-input embeddings calls."""
+
+    async def process_batch(self, texts: List[str]) -> List[List[float]]:
+        logger.debug("Embedding batch of %s texts", len(texts))
+        vectors = await asyncio.to_thread(embed_texts, texts)
+        # Warm the embedding cache so later lookups of freshly stored recipes are free
+        await asyncio.to_thread(put_cached_embeddings, texts, vectors)
+        return vectors
+
+class QdrantUpsertBatcher(AsyncBatcher):
+    """Coalesce recipe point writes into a single Qdrant upsert."""
+
+    async def process_batch(self, points: List[PointStruct]) -> List[bool]:
+        logger.debug("Upserting batch of %s points", len(points))
+        vector_store = get_vector_store()
+        success = await asyncio.to_thread(vector_store.upsert_points, points)
+        return [success] * len(points)
+
+class QdrantSearchBatcher(AsyncBatcher):
+    """Coalesce concurrent vector searches into a single Qdrant batch search."""
+
+    async def process_batch(self, requests: List[SearchRequest]) -> List[List[dict]]:
+        logger.debug("Searching batch of %s queries", len(requests))
+        vector_store = get_vector_store()
+        return await asyncio.to_thread(vector_store.search_batch, requests)
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one in-flight call.
+
+    The first caller for a key runs the work; callers arriving while it is
+    still running await the same result (or exception) instead of repeating it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` once per key at a time and share its result."""
+        future = self._inflight.get(key)
+        if future is not None:
+            # Shield so a cancelled waiter doesn't cancel the call everyone shares
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved so it isn't logged when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+# Global batchers (embedding callers are interactive, so keep their window short)
+embed_batcher = EmbedBatcher(max_wait_ms=10)
+qdrant_batcher = QdrantUpsertBatcher()
+search_batcher = QdrantSearchBatcher(max_wait_ms=10)
+
+# Global single-flight groups (keyed by exact embedding text / recipe URL)
+embed_flight = SingleFlight()
+extract_flight = SingleFlight()
+
+# Vector writes still running after their request returned (kept referenced until done)
+_background_writes = set()
+
+async def _upsert_point_with_retry(point: PointStruct, attempts: int = 3) -> None:
+    """Write one point through the upsert batcher, retrying with backoff."""
+    for attempt in range(1, attempts + 1):
+        try:
+            if await qdrant_batcher.submit(point):
+                return
+        except Exception as e:
+            logger.warning(f"Vector write for recipe {point.id} failed (attempt {attempt}): {e}")
+        if attempt < attempts:
+            await asyncio.sleep(2 ** attempt)
+    logger.error(f"Giving up on vector write for recipe {point.id} after {attempts} attempts")
+
+def store_point_in_background(point: PointStruct) -> None:
+    """
+    Write a recipe point without making the caller wait for Qdrant.
+    
+    MongoDB already holds the recipe, so the response only needs its ID; the
+    write is retried in the background and drained on shutdown.
+    """
+    task = asyncio.get_running_loop().create_task(_upsert_point_with_retry(point))
+    _background_writes.add(task)
+    task.add_done_callback(_background_writes.discard)
+
+async def drain_background_writes(timeout: float = 10) -> None:
+    """Wait (up to `timeout` seconds) for background vector writes to finish."""
+    if _background_writes:
+        logger.info(f"Waiting for {len(_background_writes)} background vector writes")
+        await asyncio.wait(list(_background_writes), timeout=timeout)
+
+async def _embed_uncached(text: str) -> List[float]:
+    """Embed a text missing from the in-process cache, checking the persistent tier off the event loop first."""
+    vector = await asyncio.to_thread(get_persisted_embedding, text)
+    if vector is not None:
+        return vector
+    return await embed_batcher.submit(text)
+
+async def coalesced_embed(text: str) -> List[float]:
+    """
+    Embed a text through the embedding cache, single-flight group, and batcher.
+    
+    Texts in the in-process cache return immediately; for the rest, concurrent
+    requests for the same text share one persistent-cache lookup and embedding,
+    and distinct texts arriving together go out as one API call.
+    """
+    vector = get_cached_embedding(text)
+    if vector is not None:
+        return vector
+    return await embed_flight.do(text, _embed_uncached, text)
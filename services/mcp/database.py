@@ -3,22 +3,33 @@
 import logging
 import sys
 import os
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
+import grpc
 from bson import ObjectId
 from pymongo import MongoClient
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, Distance, VectorParams
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import (
+    PointStruct, Distance, VectorParams, Filter, HasIdCondition,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    SearchParams, QuantizationSearchParams, PayloadSelectorInclude, SearchRequest,
+    HnswConfigDiff
+)
 import uuid
 from datetime import datetime
 
 # Add the current directory to Python path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from config import config
+    from embeddings import normalize_vector
 except ImportError:
     # Try relative imports if running as module
     from .config import config
+    from .embeddings import normalize_vector
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +41,12 @@ def get_mongodb_client() -> MongoClient:
     """Get or create MongoDB client."""
     global _mongodb_client
     if _mongodb_client is None:
-        _mongodb_client = MongoClient(config.MONGODB_URL)
+        # Keep a warm pool so bursts don't pay connection setup
+        _mongodb_client = MongoClient(
+            config.MONGODB_URL,
+            maxPoolSize=config.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=config.MONGODB_MIN_POOL_SIZE
+        )
         logger.info("MongoDB client initialized")
     return _mongodb_client
 
@@ -38,11 +54,12 @@ def get_qdrant_client() -> QdrantClient:
     """Get or create Qdrant client."""
     global _qdrant_client
     if _qdrant_client is None:
-        print(f"QDRANT_URL: {config.QDRANT_URL}")
-        print(f"QDRANT_API_KEY: {config.QDRANT_API_KEY}")
+        logger.debug("Connecting to Qdrant at %s", config.QDRANT_URL)
+        # gRPC sends query vectors as packed floats over a persistent HTTP/2 channel
         _qdrant_client = QdrantClient(
             url=config.QDRANT_URL,
-            api_key=config.QDRANT_API_KEY
+            api_key=config.QDRANT_API_KEY,
+            prefer_grpc=config.QDRANT_PREFER_GRPC
         )
         logger.info("Qdrant client initialized")
     return _qdrant_client
@@ -62,34 +79,168 @@ class VectorStore:
             collection_names = [c.name for c in collections.collections]
             
             if self.collection_name not in collection_names:
+                # Vectors are L2-normalized by embed_query, so dot product == cosine
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
+                    vectors_config=VectorParams(size=1536, distance=Distance.DOT),
+                    # int8 scalar quantization keeps the index in RAM at 1/4 the size
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                    )
                 )
                 logger.info(f"Created collection: {self.collection_name}")
         except Exception as e:
             logger.error(f"Error ensuring collection: {e}")
     
-    def search_recipes(self, query_vector: List[float], limit: int = 10) -> List[Dict[str, Any]]:
-        """Search recipes by vector similarity."""
+    def search_recipes(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        exclude_ids: Optional[List[str]] = None,
+        offset: int = 0,
+        fields: Optional[List[str]] = None,
+        with_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Search recipes by vector similarity, optionally excluding recipes by their MongoDB IDs.
+        
+        Args:
+            query_vector: Unit-length query embedding
+            limit: Maximum number of recipes to return
+            exclude_ids: MongoDB IDs of recipes to leave out of the results
+            offset: Number of top results to skip (for pagination)
+            fields: Payload fields to return; all fields when omitted. `mongo_id` is always included.
+            with_vectors: Also return each recipe's stored vector under `vector`
+        """
         try:
             results = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
-                limit=limit
+                query_filter=self._exclude_filter(exclude_ids),
+                with_payload=self._payload_selector(fields),
+                with_vectors=with_vectors,
+                search_params=self._search_params(),
+                limit=limit,
+                offset=offset
             )
             
-            recipes = []
-            for result in results:
-                recipe_data = result.payload
-                recipe_data['score'] = result.score
-                recipes.append(recipe_data)
-            
-            return recipes
+            return self._to_recipes(results)
         except Exception as e:
             logger.error(f"Error searching recipes: {e}")
             return []
     
+    def build_search_request(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        exclude_ids: Optional[List[str]] = None,
+        offset: int = 0,
+        fields: Optional[List[str]] = None,
+        with_vectors: bool = False
+    ) -> SearchRequest:
+        """Build one entry of a batch search; arguments match `search_recipes`."""
+        return SearchRequest(
+            vector=query_vector,
+            filter=self._exclude_filter(exclude_ids),
+            with_payload=self._payload_selector(fields),
+            with_vector=with_vectors,
+            params=self._search_params(),
+            limit=limit,
+            offset=offset
+        )
+    
+    def search_batch(self, requests: List[SearchRequest]) -> List[List[Dict[str, Any]]]:
+        """Run several searches in one Qdrant round trip, returning recipes per request in order."""
+        try:
+            results = self.client.search_batch(
+                collection_name=self.collection_name,
+                requests=requests
+            )
+            return [self._to_recipes(result) for result in results]
+        except Exception as e:
+            logger.error(f"Error in batch recipe search: {e}")
+            return [[] for _ in requests]
+    
+    def recommend_recipes(
+        self,
+        recipe_id: str,
+        limit: int = 5,
+        fields: Optional[List[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find recipes similar to a stored recipe using its vector already in Qdrant.
+        
+        The source recipe itself is never part of the results.
+        
+        Args:
+            recipe_id: MongoDB ID of the stored recipe
+            limit: Maximum number of recipes to return
+            fields: Payload fields to return; all fields when omitted. `mongo_id` is always included.
+            
+        Returns:
+            The similar recipes, or None if the recipe has no point in Qdrant
+        """
+        try:
+            results = self.client.recommend(
+                collection_name=self.collection_name,
+                positive=[self._convert_to_qdrant_id(recipe_id)],
+                with_payload=self._payload_selector(fields),
+                search_params=self._search_params(),
+                limit=limit
+            )
+            
+            return self._to_recipes(results)
+        except UnexpectedResponse as e:
+            if e.status_code == 404:
+                logger.debug("No Qdrant point for recipe %s", recipe_id)
+                return None
+            logger.error(f"Error recommending recipes: {e}")
+            return []
+        except grpc.RpcError as e:
+            # Over gRPC (QDRANT_PREFER_GRPC) a missing point is NOT_FOUND rather than a REST 404
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                logger.debug("No Qdrant point for recipe %s", recipe_id)
+                return None
+            logger.error(f"Error recommending recipes: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Error recommending recipes: {e}")
+            return []
+    
+    def _exclude_filter(self, exclude_ids: Optional[List[str]]) -> Optional[Filter]:
+        """Exclude recipes inside Qdrant so the caller still gets `limit` neighbors."""
+        if not exclude_ids:
+            return None
+        return Filter(
+            must_not=[HasIdCondition(has_id=[self._convert_to_qdrant_id(mongo_id) for mongo_id in exclude_ids])]
+        )
+    
+    @staticmethod
+    def _payload_selector(fields: Optional[List[str]]):
+        """Only ship the requested payload fields back from Qdrant."""
+        if not fields:
+            return True
+        return PayloadSelectorInclude(include=list({*fields, "mongo_id"}))
+    
+    @staticmethod
+    def _search_params() -> SearchParams:
+        """Rescore the oversampled quantized candidates against the original vectors."""
+        return SearchParams(
+            quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+        )
+    
+    @staticmethod
+    def _to_recipes(results) -> List[Dict[str, Any]]:
+        """Turn scored Qdrant points into recipe payloads with their score (and vector, if fetched)."""
+        recipes = []
+        for result in results:
+            recipe_data = result.payload
+            recipe_data['score'] = result.score
+            if result.vector is not None:
+                recipe_data['vector'] = result.vector
+            recipes.append(recipe_data)
+        return recipes
+    
     def _convert_to_qdrant_id(self, mongo_id: str) -> int:
         """Convert MongoDB ObjectId string to numeric ID suitable for Qdrant."""
         # Initialize a hash value
@@ -110,15 +261,69 @@ class VectorStore:
         # Also ensure it's within a reasonable range for Qdrant
         return abs(hash_val) % (2**31)  # Keep within 31-bit positive range
 
+    def build_point(self, recipe_id: str, recipe_vector: List[float], recipe_data: Dict[str, Any]) -> PointStruct:
+        """Build the Qdrant point for a recipe."""
+        recipe_data["mongo_id"] = recipe_id
+        return PointStruct(
+            id=self._convert_to_qdrant_id(recipe_id),
+            # The collection uses dot-product distance, which assumes unit-length vectors
+            vector=normalize_vector(recipe_vector),
+            payload=recipe_data
+        )
+
+    def upsert_points(self, points: List[PointStruct], wait: bool = True) -> bool:
+        """Upsert a batch of recipe points in a single Qdrant call."""
+        try:
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points,
+                wait=wait
+            )
+            
+            logger.info(f"Upserted {len(points)} recipes to vector store")
+            return True
+        except Exception as e:
+            logger.error(f"Error upserting recipes to vector store: {e}")
+            return False
+
+    def pause_indexing(self) -> Optional[int]:
+        """
+        Stop building the HNSW graph for new points (m=0) ahead of a bulk load.
+        
+        Returns:
+            The collection's previous HNSW m, to pass to resume_indexing, or None if pausing failed
+        """
+        try:
+            hnsw_config = self.client.get_collection(self.collection_name).config.hnsw_config
+            # A load that died mid-way leaves m=0 behind; don't carry that forward
+            previous_m = hnsw_config.m or 16
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                hnsw_config=HnswConfigDiff(m=0)
+            )
+            logger.info(f"Paused HNSW indexing for bulk load (previous m={previous_m})")
+            return previous_m
+        except Exception as e:
+            logger.error(f"Error pausing HNSW indexing: {e}")
+            return None
+    
+    def resume_indexing(self, m: int) -> bool:
+        """Restore the HNSW graph's m after a bulk load; Qdrant rebuilds it in the background."""
+        try:
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                hnsw_config=HnswConfigDiff(m=m)
+            )
+            logger.info(f"Resumed HNSW indexing (m={m})")
+            return True
+        except Exception as e:
+            logger.error(f"Error resuming HNSW indexing: {e}")
+            return False
+
     def add_recipe(self, recipe_id: str, recipe_vector: List[float], recipe_data: Dict[str, Any]) -> bool:
         """Add a recipe to the vector store."""
         try:
-            recipe_data["mongo_id"] = recipe_id
-            point = PointStruct(
-                id=self._convert_to_qdrant_id(recipe_id),
-                vector=recipe_vector,
-                payload=recipe_data
-            )
+            point = self.build_point(recipe_id, recipe_vector, recipe_data)
             
             self.client.upsert(
                 collection_name=self.collection_name,
@@ -138,6 +343,15 @@ class MongoDBStore:
         self.client = get_mongodb_client()
         self.db = self.client.recipes
         self.collection = self.db.parsed_recipes
+        self._ensure_indexes()
+    
+    def _ensure_indexes(self):
+        """Ensure indexes used by recipe lookups exist."""
+        try:
+            # Recipes are upserted by link, so it doubles as a unique key for URL lookups
+            self.collection.create_index("link", unique=True)
+        except Exception as e:
+            logger.error(f"Error ensuring recipe indexes: {e}")
     
     def get_recipe(self, recipe_id: str) -> Optional[Dict[str, Any]]:
         """Get a recipe by ID."""
@@ -148,6 +362,57 @@ class MongoDBStore:
             logger.error(f"Error getting recipe: {e}")
             return None
     
+    def get_recipe_normalized(self, recipe_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a recipe by ID with `ingredients` normalized to a list of trimmed, non-empty strings.
+        
+        Newline-separated strings are split server-side, so the driver returns the final array.
+        """
+        def trimmed_nonempty(values):
+            return {
+                "$filter": {
+                    "input": {
+                        "$map": {
+                            "input": values,
+                            "as": "i",
+                            "in": {"$trim": {"input": {"$convert": {"input": "$$i", "to": "string", "onError": "", "onNull": ""}}}}
+                        }
+                    },
+                    "cond": {"$ne": ["$$this", ""]}
+                }
+            }
+        
+        try:
+            pipeline = [
+                {"$match": {"_id": ObjectId(recipe_id)}},
+                {"$limit": 1},
+                {"$addFields": {
+                    "ingredients": {
+                        "$switch": {
+                            "branches": [
+                                {"case": {"$eq": [{"$type": "$ingredients"}, "string"]},
+                                 "then": trimmed_nonempty({"$split": ["$ingredients", "\n"]})},
+                                {"case": {"$isArray": "$ingredients"},
+                                 "then": trimmed_nonempty("$ingredients")}
+                            ],
+                            "default": []
+                        }
+                    }
+                }}
+            ]
+            return next(self.collection.aggregate(pipeline), None)
+        except Exception as e:
+            logger.error(f"Error getting normalized recipe: {e}")
+            return None
+    
+    def get_recipe_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get a recipe by its source URL."""
+        try:
+            return self.collection.find_one({"link": url})
+        except Exception as e:
+            logger.error(f"Error getting recipe by URL: {e}")
+            return None
+    
     def save_recipe(self, recipe_data: Dict[str, Any], embedding_prompt: Optional[str] = None) -> str:
         """Save a recipe to MongoDB."""
         try:
@@ -331,20 +596,13 @@ class MongoDBStore:
             logger.error(f"Error checking if recipe is saved: {e}")
             return False
 
-# Global instances
-_vector_store: Optional[VectorStore] = None
-_mongodb_store: Optional[MongoDBStore] = None
-
+# Process-wide store instances (one per worker, sharing the client pools above)
+@lru_cache(maxsize=1)
 def get_vector_store() -> VectorStore:
     """Get or create vector store instance."""
-    global _vector_store
-    if _vector_store is None:
-        _vector_store = VectorStore()
-    return _vector_store
+    return VectorStore()
 
+@lru_cache(maxsize=1)
 def get_mongodb_store() -> MongoDBStore:
     """Get or create MongoDB store instance."""
-    global _mongodb_store
-    if _mongodb_store is None:
-        _mongodb_store = MongoDBStore()
-    return _mongodb_store 
\ No newline at end of file
+    return MongoDBStore() 
\ No newline at end of file
@@ -1,13 +1,15 @@
 """OpenAI embeddings for recipe similarity."""
 
 import logging
+import math
 import sys
 import os
 from typing import List
 from openai import OpenAI
 
 # Add the current directory to Python path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from config import config
@@ -27,15 +29,37 @@ def get_embeddings() -> OpenAI:
         logger.info("OpenAI embeddings client initialized")
     return _embeddings_client
 
+def normalize_vector(vector: List[float]) -> List[float]:
+    """L2-normalize a vector so dot product equals cosine similarity."""
+    norm = math.hypot(*vector)
+    if norm == 0:
+        return list(vector)
+    return [x / norm for x in vector]
+
 def embed_query(text: str) -> List[float]:
-    """Generate embeddings for a text query."""
+    """Generate an L2-normalized embedding for a text query."""
     try:
         client = get_embeddings()
         response = client.embeddings.create(
             model=config.OPENAI_EMBEDDING_MODEL,
             input=text
         )
-        return response.data[0].embedding
+        return normalize_vector(response.data[0].embedding)
     except Exception as e:
         logger.error(f"Error generating embeddings: {e}")
-        raise 
\ No newline at end of file
+        raise 
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Generate L2-normalized embeddings for several texts in one API call."""
+    try:
+        client = get_embeddings()
+        response = client.embeddings.create(
+            model=config.OPENAI_EMBEDDING_MODEL,
+            input=texts
+        )
+        # The API may return items out of order; index tells us where each belongs
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [normalize_vector(item.embedding) for item in ordered]
+    except Exception as e:
+        logger.error(f"Error generating batch embeddings: {e}")
+        raise
\ No newline at end of file
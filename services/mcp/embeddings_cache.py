@@ -0,0 +1,116 @@
+"""Content-addressed cache for text embeddings."""
+
+import hashlib
+import logging
+import sqlite3
+import sys
+import os
+import threading
+from array import array
+from typing import List, Optional
+
+from cachetools import LRUCache
+
+# Add the current directory to Python path for imports
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from config import config
+except ImportError:
+    # Try relative imports if running as module
+    from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Vectors are stored as float32 arrays (~6KB each instead of ~50KB as float lists)
+_embedding_cache: LRUCache = LRUCache(maxsize=config.EMBEDDING_CACHE_SIZE)
+# Embeddings are computed in worker threads, so guard the LRU bookkeeping
+_lock = threading.Lock()
+
+# Optional persistent tier (SQLite) so embeddings survive restarts; disabled when no path is set
+_db: Optional[sqlite3.Connection] = None
+_db_lock = threading.Lock()
+
+def get_embedding_db() -> Optional[sqlite3.Connection]:
+    """Get or open the persistent embedding store, or None when it is disabled."""
+    global _db
+    if _db is None and config.EMBEDDING_CACHE_PATH:
+        with _db_lock:
+            if _db is None:
+                db = sqlite3.connect(config.EMBEDDING_CACHE_PATH, check_same_thread=False)
+                # WAL with NORMAL sync keeps commits cheap; a crash can lose only recent cache entries
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                # The model is kept alongside the vector so entries for old models can be pruned
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings "
+                    "(key TEXT PRIMARY KEY, model TEXT NOT NULL, vec BLOB NOT NULL)"
+                )
+                db.commit()
+                _db = db
+                logger.info(f"Persistent embedding cache opened at {config.EMBEDDING_CACHE_PATH}")
+    return _db
+
+def embedding_cache_key(text: str, model: Optional[str] = None) -> str:
+    """Hash the embedding model and text into a cache key."""
+    model = model or config.OPENAI_EMBEDDING_MODEL
+    return hashlib.blake2b(model.encode() + b"\0" + text.encode(), digest_size=16).hexdigest()
+
+def get_cached_embedding(text: str) -> Optional[List[float]]:
+    """Return the embedding for a text from the in-process tier, or None on a miss (never blocks on disk)."""
+    key = embedding_cache_key(text)
+    with _lock:
+        vector = _embedding_cache.get(key)
+    return vector.tolist() if vector is not None else None
+
+def get_persisted_embedding(text: str) -> Optional[List[float]]:
+    """
+    Return the embedding for a text from the persistent tier, or None on a miss.
+    
+    This does blocking SQLite I/O, so async callers should run it in a worker thread.
+    """
+    db = get_embedding_db()
+    if db is None:
+        return None
+    key = embedding_cache_key(text)
+    try:
+        with _db_lock:
+            row = db.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Error reading persistent embedding cache: {e}")
+        return None
+    if row is None:
+        return None
+    
+    # Promote to the in-process tier
+    vector = array("f")
+    vector.frombytes(row[0])
+    with _lock:
+        _embedding_cache[key] = vector
+    return vector.tolist()
+
+def put_cached_embedding(text: str, vector: List[float]) -> None:
+    """Cache the embedding computed for a text."""
+    put_cached_embeddings([text], [vector])
+
+def put_cached_embeddings(texts: List[str], vectors: List[List[float]]) -> None:
+    """Cache the embeddings computed for several texts, writing the persistent tier in one transaction."""
+    model = config.OPENAI_EMBEDDING_MODEL
+    rows = []
+    with _lock:
+        for text, vector in zip(texts, vectors):
+            key = embedding_cache_key(text, model)
+            packed = array("f", vector)
+            _embedding_cache[key] = packed
+            rows.append((key, model, packed.tobytes()))
+    
+    db = get_embedding_db()
+    if db is None:
+        return
+    try:
+        with _db_lock:
+            db.executemany("INSERT OR REPLACE INTO embeddings (key, model, vec) VALUES (?, ?, ?)", rows)
+            db.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Error writing persistent embedding cache: {e}")
@@ -0,0 +1,64 @@
+"""Vectorized re-ranking of vector search candidates."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+def split_vectors(recipes: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    Pop the `vector` returned with each search result into one float32 matrix.
+    
+    Args:
+        recipes: Search results fetched with vectors
+        
+    Returns:
+        The recipes without their vectors and an (N, d) matrix of those vectors
+    """
+    vectors = [recipe.pop("vector") for recipe in recipes]
+    if not vectors:
+        return recipes, np.zeros((0, 0), dtype=np.float32)
+    # C-contiguous float32 rows keep the re-rank matmul on the BLAS fast path
+    return recipes, np.ascontiguousarray(vectors, dtype=np.float32)
+
+def rerank(
+    candidate_vectors: np.ndarray,
+    query_vector: Sequence[float],
+    lexical_scores: Optional[np.ndarray] = None,
+    alpha: float = 0.7,
+    exclude: Optional[np.ndarray] = None,
+    top_k: Optional[int] = None
+) -> np.ndarray:
+    """
+    Order candidates by similarity to the query, best first.
+    
+    Candidate and query vectors are expected to be unit length, so the dot
+    product is the cosine similarity. When lexical scores (e.g. BM25) are
+    given, the score is `alpha * similarity + (1 - alpha) * lexical`.
+    
+    Args:
+        candidate_vectors: (N, d) matrix of candidate vectors
+        query_vector: Query vector of length d
+        lexical_scores: Optional (N,) lexical scores on the same scale as similarity
+        alpha: Weight of the vector similarity when lexical scores are given
+        exclude: Optional (N,) boolean mask of candidates to drop
+        top_k: Only rank the best `top_k` candidates (partial sort)
+        
+    Returns:
+        Indices of the kept candidates, best first
+    """
+    if len(candidate_vectors) == 0:
+        return np.zeros(0, dtype=np.intp)
+    
+    scores = candidate_vectors @ np.asarray(query_vector, dtype=np.float32)
+    if lexical_scores is not None:
+        scores = alpha * scores + (1 - alpha) * lexical_scores
+    if exclude is not None:
+        scores[exclude] = -np.inf
+    
+    if top_k is not None and top_k < len(scores):
+        # Select the top k in O(N), then sort only those
+        candidates = np.argpartition(-scores, top_k)[:top_k]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    else:
+        order = np.argsort(-scores, kind="stable")
+    return order[np.isfinite(scores[order])]
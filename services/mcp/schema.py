@@ -6,6 +6,7 @@ It uses Pydantic for runtime validation and handles snake_case/camelCase convers
 """
 
 from typing import List, Optional, Dict, Any, Union
+from dataclasses import dataclass
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator, model_validator
 import re
@@ -149,6 +150,41 @@ class EnrichedRecipe(Recipe):
     # MongoDB ID (optional for creation, required for retrieval)
     mongo_id: Optional[str] = Field(None, alias="_id", description="MongoDB ObjectId")
 
+@dataclass(slots=True)
+class RecipeResult:
+    """Result of extracting and storing a recipe (plain slotted dataclass, no validation)."""
+    recipe_id: str
+    url: str
+    title: str = "Unknown"
+    summary: str = ""
+    success: bool = True
+    # True when an already-stored recipe was returned instead of storing a new one
+    deduped: bool = False
+
+    @classmethod
+    def from_enriched(
+        cls, recipe_id: str, url: str, enriched_data: Dict[str, Any], deduped: bool = False
+    ) -> "RecipeResult":
+        """Build a result from enriched recipe data."""
+        return cls(
+            recipe_id=recipe_id,
+            url=url,
+            title=enriched_data.get("title") or "Unknown",
+            summary=enriched_data.get("summary") or "",
+            deduped=deduped
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the JSON response shape."""
+        return {
+            "success": self.success,
+            "recipe_id": self.recipe_id,
+            "title": self.title,
+            "url": self.url,
+            "summary": self.summary,
+            "deduped": self.deduped
+        }
+
 # Runtime validation functions
 def validate_recipe(data: Dict[str, Any]) -> Recipe:
     """
@@ -245,6 +281,7 @@ __all__ = [
     'EnrichedRecipe',
     'Nutrients',
     'Relevance',
+    'RecipeResult',
     'validate_recipe',
     'recipe_to_dict',
     'dict_to_recipe',
@@ -0,0 +1,150 @@
+"""In-process semantic cache for vector search results."""
+
+import logging
+import sys
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Add the current directory to Python path for imports
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from config import config
+except ImportError:
+    # Try relative imports if running as module
+    from .config import config
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """
+    LRU + TTL cache keyed by query embeddings.
+
+    A lookup hits when the cosine similarity between the query vector and a
+    cached vector is at least `tau`. Cached vectors live in a preallocated
+    float32 matrix so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600, tau: float = 0.97, dim: int = 1536):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.tau = tau
+        self.dim = dim
+        self._matrix = np.zeros((maxsize, dim), dtype=np.float32)
+        self._created_at = np.zeros(maxsize, dtype=np.float64)
+        self._last_used = np.zeros(maxsize, dtype=np.float64)
+        self._values: List[Any] = [None] * maxsize
+        # Scratch buffers reused by every lookup so scoring allocates nothing per call
+        self._scores = np.empty(maxsize, dtype=np.float32)
+        self._expired = np.empty(maxsize, dtype=bool)
+        self._size = 0
+        # Hit/miss counts for tuning `tau` against real traffic
+        self.hits = 0
+        self.misses = 0
+        # Tools may run in worker threads, so guard slot updates with a thread lock
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Convert a vector to a unit-length float32 array."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        if norm > 0:
+            array = array / norm
+        return array
+
+    def get(self, vector: List[float], accept: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Return the cached value for the most similar live vector, or None on a miss.
+
+        Args:
+            vector: Query embedding
+            accept: Optional check that the cached value can serve this lookup (for
+                example, that it holds enough results); a rejected value is a miss
+        """
+        query = self._normalize(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None
+
+            # Rows are unit length, so one matrix-vector product gives every cosine similarity
+            similarities = self._scores[:self._size]
+            np.dot(self._matrix[:self._size], query, out=similarities)
+            # Expired entries can never hit
+            expired = self._expired[:self._size]
+            np.less(self._created_at[:self._size], now - self.ttl, out=expired)
+            similarities[expired] = -np.inf
+
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.tau or (accept is not None and not accept(self._values[best])):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._last_used[best] = now
+            return self._values[best]
+
+    def put(self, vector: List[float], value: Any) -> None:
+        """
+        Cache a value.
+
+        A vector within `tau` of a cached one replaces that entry, so refreshing a
+        rejected or expired entry doesn't add a duplicate row that `get` would never
+        reach. Otherwise a free slot is used, or the least recently used one when full.
+        """
+        query = self._normalize(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            slot = None
+            if self._size > 0:
+                similarities = self._scores[:self._size]
+                np.dot(self._matrix[:self._size], query, out=similarities)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.tau:
+                    slot = best
+
+            if slot is None:
+                if self._size < self.maxsize:
+                    slot = self._size
+                    self._size += 1
+                else:
+                    slot = int(np.argmin(self._last_used))
+
+            self._matrix[slot] = query
+            self._created_at[slot] = now
+            self._last_used[slot] = now
+            self._values[slot] = value
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, hit/miss counts, and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._size = 0
+            self._values = [None] * self.maxsize
+
+def create_semantic_cache() -> SemanticCache:
+    """Create a semantic cache using the configured size, TTL, and similarity threshold."""
+    return SemanticCache(
+        maxsize=config.SEMANTIC_CACHE_SIZE,
+        ttl=config.SEMANTIC_CACHE_TTL,
+        tau=config.SEMANTIC_CACHE_THRESHOLD
+    )
@@ -6,25 +6,39 @@ Recipe Agent MCP Server using FastAPI with FastMCP mounted.
 import os
 import random
 import sys
-from typing import List, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Query, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastmcp import FastMCP
 import asyncio
+import httpx
+import numpy as np
+import orjson
 import uvicorn
 
 # Add the current directory to Python path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import our database and tools
+from batching import (
+    coalesced_embed, search_batcher, extract_flight,
+    store_point_in_background, drain_background_writes
+)
+from config import config
 from database import get_vector_store, get_mongodb_store
-from embeddings import embed_query
+from ranking import rerank, split_vectors
+from schema import RecipeResult
+from semantic_cache import create_semantic_cache
 
-# Add debug logging to see when tools are called
+# Log level comes from LOG_LEVEL (default INFO); debug messages use lazy %-formatting
 import logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -35,127 +49,284 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY environment variable is required")
 
+# Timeouts for outbound HTTP calls
+HTTP_TIMEOUTS = {
+    "openai": httpx.Timeout(10.0, connect=3.0),
+}
+
+# Shared OpenAI HTTP client (keeps TLS connections alive between requests)
+_openai_http_client: Optional[httpx.AsyncClient] = None
+
+def get_openai_http_client() -> httpx.AsyncClient:
+    """Get or create the pooled HTTP client for direct OpenAI REST calls."""
+    global _openai_http_client
+    if _openai_http_client is None:
+        _openai_http_client = httpx.AsyncClient(
+            base_url="https://api.openai.com",
+            timeout=HTTP_TIMEOUTS["openai"],
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json"
+            }
+        )
+        logger.info("OpenAI HTTP client initialized")
+    return _openai_http_client
+
+async def close_openai_http_client():
+    """Close the pooled OpenAI HTTP client."""
+    global _openai_http_client
+    if _openai_http_client is not None:
+        await _openai_http_client.aclose()
+        _openai_http_client = None
+        logger.info("OpenAI HTTP client closed")
+
+def _json_default(value: Any) -> Any:
+    """Serialize values orjson doesn't know natively (ObjectIds and the like)."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+class RecipeJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (datetimes and numpy arrays natively, ObjectIds via default)."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+# Bulk ingestion limits
+BULK_INGEST_CONCURRENCY = 8
+BULK_UPSERT_CHUNK_SIZE = 256
+
+# Bulk loads share one indexing pause: the first to start pauses it, the last to finish restores it
+_bulk_ingest_lock = asyncio.Lock()
+_bulk_ingest_active = 0
+_bulk_ingest_hnsw_m: Optional[int] = None
+
 # Create FastAPI app
-api = FastAPI(title="Recipe Agent API", version="1.0.0")
+# Handlers that return plain dicts are rendered with orjson as well
+api = FastAPI(title="Recipe Agent API", version="1.0.0", default_response_class=RecipeJSONResponse)
 
-# Add CORS middleware
+# Add CORS middleware (explicit origins: "*" is not valid together with credentials)
 api.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=config.CORS_ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
+    allow_headers=["content-type", "authorization"],
+    max_age=config.CORS_MAX_AGE,
 )
 
+class RESTGZipMiddleware(GZipMiddleware):
+    """Gzip REST responses; the mounted MCP app streams SSE and is passed through untouched."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/mcp"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress large JSON payloads (recipe listings with full ingredients/instructions)
+api.add_middleware(RESTGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Create FastMCP server
 mcp = FastMCP(name="recipe-agent")
 
+# Semantic caches for vector search results (separate caches per result shape)
+search_cache = create_semantic_cache()
+similar_cache = create_semantic_cache()
+
+# Recently fetched recipes by ID (agents tend to re-read the same recipe while answering)
+recipe_cache: TTLCache = TTLCache(maxsize=config.RECIPE_CACHE_SIZE, ttl=config.RECIPE_CACHE_TTL)
+
 """
 Basic functions called by tools and exposed as endpoints.
 """
 
-async def _search_recipes(query: str) -> List[Dict[str, Any]]:
+async def _get_recipe_cached(recipe_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a recipe by ID (ingredients normalized to a list) through the TTL cache.
+    
+    Returns a shallow copy so callers can normalize fields without touching the cached entry.
+    """
+    recipe = recipe_cache.get(recipe_id)
+    if recipe is None:
+        recipe = await asyncio.to_thread(api.state.mongo.get_recipe_normalized, recipe_id)
+        if not recipe:
+            return None
+        recipe_cache[recipe_id] = recipe
+    return dict(recipe)
+
+async def _search_recipes(
+    query: str,
+    limit: int = 50,
+    offset: int = 0,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
     """
     Search for recipes using natural language queries with vector similarity.
     
     Args:
         query: Natural language description of recipes to find
+        limit: Maximum number of recipes to return
+        offset: Number of top results to skip (for pagination)
+        fields: Recipe fields to return; full recipes when omitted
         
     Returns:
         A list of recipes matching the query
     """
-    logger.debug(f"search_recipes called with query: '{query}'")
+    logger.debug("search_recipes called with query: '%s'", query)
     try:
         # Get embeddings for the query
-        query_vector = embed_query(query)
-        logger.debug(f"Got embeddings for query")
+        query_vector = await coalesced_embed(query)
+        logger.debug("Got embeddings for query")
+        
+        # Near-duplicate queries reuse the previous Qdrant results; only first pages
+        # of full recipes are cached
+        use_cache = offset == 0 and not fields
+        if use_cache:
+            # Entries remember the limit they were fetched with, so a larger
+            # earlier search can serve a smaller one but not the reverse
+            cached = search_cache.get(query_vector, accept=lambda entry: entry[0] >= limit)
+            if cached is not None:
+                logger.debug("Semantic cache hit for query")
+                return cached[1][:limit]
         
         # Search vector store (Qdrant)
-        vector_store = get_vector_store()
-        recipes = vector_store.search_recipes(query_vector, limit=50)
-        logger.debug(f"Found {len(recipes)} recipes")
+        vector_store = api.state.vector
+        recipes = await search_batcher.submit(
+            vector_store.build_search_request(query_vector, limit=limit, offset=offset, fields=fields)
+        )
+        logger.debug("Found %s recipes", len(recipes))
         
+        if use_cache:
+            search_cache.put(query_vector, (limit, recipes))
         return recipes
         
     except Exception as e:
         logger.error(f"Error searching recipes: {e}")
         return []
 
-async def _get_recipe_by_id(recipe_id: str) -> dict:
-    logger.debug(f"get_recipe_by_id called with recipe_id: '{recipe_id}'")
-    try:
-        # Get the recipe from MongoDB
-        mongo_store = get_mongodb_store()
-        recipe = mongo_store.get_recipe(recipe_id)
-        
-        if not recipe:
-            raise ValueError(f"Recipe with ID '{recipe_id}' not found")
-        
-        recipe["_id"] = recipe_id
-        # Normalize ingredients - handle both string and array formats
-        ingredients = recipe.get("ingredients", "")
-        if isinstance(ingredients, str):
-            recipe["ingredients"] = [ingredient.strip() for ingredient in ingredients.split('\n') if ingredient.strip()]
-        elif isinstance(ingredients, list):
-            recipe["ingredients"] = [str(ingredient).strip() for ingredient in ingredients if str(ingredient).strip()]
-        else:
-            recipe["ingredients"] = []
-        
-        # Convert datetime objects to ISO format strings for JSON serialization
-        for key, value in recipe.items():
-            if hasattr(value, 'isoformat'):  # Check if it's a datetime object
-                recipe[key] = value.isoformat()
-        
-        # Return the recipe as JSON
-        return recipe
-    except Exception as e:
-        logger.error(f"Error fetching recipe {recipe_id}: {e}")
-        raise ValueError(f"Failed to fetch recipe: {str(e)}")
+async def _search_similar_cached(
+    recipe_vector: List[float],
+    limit: int,
+    exclude_ids: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Search Qdrant for similar recipes through the similar-recipes semantic cache.
+    
+    Cache entries keep the candidates' vectors, so a hit from a near-identical
+    vector is re-ranked against this exact vector with excluded recipes dropped.
+    """
+    order = None
+    
+    def rerank_cached(entry) -> bool:
+        # Only a hit if enough candidates survive the exclusions
+        nonlocal order
+        recipes, vectors = entry
+        exclude = None
+        if exclude_ids:
+            exclude = np.array([r.get('mongo_id') in exclude_ids for r in recipes], dtype=bool)
+        order = rerank(vectors, recipe_vector, exclude=exclude, top_k=limit)
+        return len(order) >= limit
+    
+    cached = similar_cache.get(recipe_vector, accept=rerank_cached)
+    if cached is not None:
+        logger.debug("Semantic cache hit for similar recipes")
+        recipes, _ = cached
+        return [recipes[i] for i in order[:limit]]
+    
+    vector_store = api.state.vector
+    recipes = await search_batcher.submit(
+        vector_store.build_search_request(recipe_vector, limit=limit, exclude_ids=exclude_ids, with_vectors=True)
+    )
+    recipes, vectors = split_vectors(recipes)
+    logger.debug("Found %s similar recipes", len(recipes))
+    
+    similar_cache.put(recipe_vector, (recipes, vectors))
+    return recipes
 
-async def _get_similar_recipes(recipe_id: str) -> List[Dict[str, Any]]:
+async def _get_recipe_by_id(recipe_id: str) -> Optional[dict]:
+    """
+    Fetch a recipe from MongoDB and normalize it for JSON responses.
+    
+    Args:
+        recipe_id: The unique identifier of the recipe
+        
+    Returns:
+        The normalized recipe, or None if no recipe exists with that ID
+    """
+    logger.debug("get_recipe_by_id called with recipe_id: '%s'", recipe_id)
+    # Get the recipe from MongoDB (or the recipe cache)
+    recipe = await _get_recipe_cached(recipe_id)
+    
+    if not recipe:
+        return None
+    
+    # Ingredients were already normalized to a list by the Mongo projection
+    recipe["_id"] = recipe_id
+    
+    # Datetimes are left as-is; RecipeJSONResponse / the MCP serializer encode them
+    return recipe
+
+async def _get_similar_recipes(
+    recipe_id: str,
+    limit: int = 5,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
     """
     Find recipes similar to a specific recipe using vector similarity.
     
     Args:
         recipe_id: The unique identifier of the recipe to find similar recipes for
+        limit: Maximum number of similar recipes to return
+        fields: Recipe fields to return; full recipes when omitted
         
     Returns:
         A list of similar recipes based on vector similarity
     """
-    logger.debug(f"get_similar_recipes called with recipe_id: '{recipe_id}'")
+    logger.debug("get_similar_recipes called with recipe_id: '%s'", recipe_id)
     try:
-        # Get the original recipe from MongoDB
-        mongo_store = get_mongodb_store()
-        original_recipe = mongo_store.get_recipe(recipe_id)
+        # Fetch the original recipe (MongoDB or the recipe cache) while Qdrant looks up
+        # neighbors of its stored point; the two calls don't depend on each other.
+        # Qdrant leaves the source point out, and no embedding call is needed.
+        vector_store = api.state.vector
+        original_recipe, similar_recipes = await asyncio.gather(
+            _get_recipe_cached(recipe_id),
+            asyncio.to_thread(vector_store.recommend_recipes, recipe_id, limit=limit, fields=fields)
+        )
         
         if not original_recipe:
-            logger.debug(f"No original recipe found for ID: {recipe_id}")
+            logger.debug("No original recipe found for ID: %s", recipe_id)
             return []
         
-        logger.debug(f"Found original recipe: {original_recipe.get('title', 'Unknown')}")
+        logger.debug("Found original recipe: %s", original_recipe.get('title', 'Unknown'))
         
-        # Use embedding_prompt if available (new approach), otherwise fall back to old approach
-        if original_recipe.get('embedding_prompt'):
-            # Use the stored embedding_prompt for consistent semantic search
-            recipe_text = original_recipe['embedding_prompt']
-            logger.debug(f"Using embedding_prompt for vector search")
-        else:
-            # Fallback for recipes without embedding_prompt (backward compatibility)
-            recipe_text = f"{original_recipe.get('title', '')} {original_recipe.get('summary', '')} {' '.join(original_recipe.get('ingredients', []))}"
-            logger.debug(f"Using fallback text for vector search (no embedding_prompt)")
+        if similar_recipes is not None:
+            logger.debug("Found %s similar recipes", len(similar_recipes))
+            return similar_recipes
         
-        # Get embeddings for the recipe
-        recipe_vector = embed_query(recipe_text)
-        logger.debug(f"Got embeddings for recipe")
+        # No Qdrant point for this recipe: embed its stored embedding_prompt instead
+        recipe_text = original_recipe.get('embedding_prompt')
+        if not recipe_text:
+            logger.debug("Recipe %s has no vector and no embedding_prompt", recipe_id)
+            return []
         
-        # Search for similar recipes using vector similarity (Qdrant)
-        vector_store = get_vector_store()
-        similar_recipes = vector_store.search_recipes(recipe_vector, limit=5)
+        # Get embeddings for the recipe
+        recipe_vector = await coalesced_embed(recipe_text)
+        logger.debug("Got embeddings for recipe")
         
-        # Filter out the original recipe from results
-        similar_recipes = [r for r in similar_recipes if r.get('_id') != recipe_id]
-        logger.debug(f"Found {len(similar_recipes)} similar recipes")
+        # Search for similar recipes using vector similarity (Qdrant), excluding the original
+        if not fields:
+            return await _search_similar_cached(recipe_vector, limit, exclude_ids=[recipe_id])
         
+        similar_recipes = await search_batcher.submit(
+            vector_store.build_search_request(recipe_vector, limit=limit, exclude_ids=[recipe_id], fields=fields)
+        )
+        logger.debug("Found %s similar recipes", len(similar_recipes))
         return similar_recipes
         
     except Exception as e:
@@ -172,8 +343,16 @@ async def _find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]
     Returns:
         A list of similar recipes based on vector similarity
     """
-    logger.debug(f"find_similar_recipes_from_url called with recipe_url: '{recipe_url}'")
+    logger.debug("find_similar_recipes_from_url called with recipe_url: '%s'", recipe_url)
     try:
+        # Already-ingested URLs reuse the stored recipe's vector (no scrape, no embedding)
+        mongo_store = api.state.mongo
+        stored_recipe = await asyncio.to_thread(mongo_store.get_recipe_by_url, recipe_url)
+        
+        if stored_recipe:
+            logger.debug("Using stored recipe for URL")
+            return await _get_similar_recipes(str(stored_recipe["_id"]))
+        
         # Extract recipe content from URL
         from tools import extract_recipe_data, enrich_recipe_with_ai, generate_embedding_prompt
         recipe_data = await extract_recipe_data(recipe_url)
@@ -181,20 +360,17 @@ async def _find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]
             return []
         
         # Enrich with AI to get the same data structure as stored recipes
-        enriched_data = asyncio.run(enrich_recipe_with_ai(recipe_data))
+        enriched_data = await enrich_recipe_with_ai(recipe_data)
         
         # Generate natural language summary (embedding_prompt) for vector search
         # This ensures we're searching with the same semantic representation
-        embedding_prompt = asyncio.run(generate_embedding_prompt(enriched_data))
+        embedding_prompt = await generate_embedding_prompt(enriched_data)
         
         # Get embeddings for the recipe using the embedding_prompt
-        recipe_vector = embed_query(embedding_prompt)
+        recipe_vector = await coalesced_embed(embedding_prompt)
         
         # Search for similar recipes using vector similarity (Qdrant)
-        vector_store = get_vector_store()
-        similar_recipes = vector_store.search_recipes(recipe_vector, limit=5)
-        
-        return similar_recipes
+        return await _search_similar_cached(recipe_vector, limit=5)
         
     except Exception as e:
         logger.error(f"Error finding similar recipes from URL: {e}")
@@ -204,50 +380,30 @@ async def _extract_and_store_recipe(url: str) -> Dict[str, Any]:
     """
     Extract recipe content from a URL, enrich with AI, and store in databases.
     
+    Concurrent requests for the same URL share a single scrape/enrich/store run.
+    
     Args:
         url: The URL of the webpage containing the recipe
         
     Returns:
         A dictionary containing the extracted and stored recipe information
     """
-    logger.debug(f"extract_and_store_recipe called with url: '{url}'")
+    logger.debug("extract_and_store_recipe called with url: '%s'", url)
+    return await extract_flight.do(url, _ingest_recipe, url)
+
+async def _ingest_recipe(url: str) -> Dict[str, Any]:
+    """Run the extract, enrich, and store pipeline for one URL."""
     try:
-        from tools import extract_recipe_data, enrich_recipe_with_ai, generate_embedding_prompt
+        prepared = await _prepare_recipe(url)
+        if "error" in prepared:
+            return prepared
         
-        # Extract recipe content
-        recipe_data = await extract_recipe_data(url)
-        if not recipe_data:
-            return {
-                "success": False,
-                "error": f"Could not extract recipe content from URL: {url}"
-            }
+        # Store in vector store with full recipe data as metadata (deduplicated recipes have no new point);
+        # the recipe is already durable in MongoDB, so don't hold the response for Qdrant
+        if "point" in prepared:
+            store_point_in_background(prepared["point"])
         
-        # Enrich with AI
-        enriched_data = await enrich_recipe_with_ai(recipe_data)
-        
-        # Generate natural language summary (embedding_prompt) for vector search
-        # This matches the TypeScript approach exactly
-        embedding_prompt = await generate_embedding_prompt(enriched_data)
-        
-        # Save to MongoDB with embedding_prompt
-        mongo_store = get_mongodb_store()
-        recipe_id = mongo_store.save_recipe(enriched_data, embedding_prompt)
-        
-        # Generate embeddings using ONLY the embedding_prompt (not the full recipe text)
-        # This ensures identical semantic meaning with the TypeScript implementation
-        recipe_vector = embed_query(embedding_prompt)
-        
-        # Store in vector store with full recipe data as metadata
-        vector_store = get_vector_store()
-        vector_store.add_recipe(recipe_id, recipe_vector, enriched_data)
-        
-        return {
-            "success": True,
-            "recipe_id": recipe_id,
-            "title": enriched_data.get("title", "Unknown"),
-            "url": url,
-            "summary": enriched_data.get("summary", "")
-        }
+        return prepared["result"]
         
     except Exception as e:
         logger.error(f"Error in extract_and_store_recipe: {e}")
@@ -256,64 +412,204 @@ async def _extract_and_store_recipe(url: str) -> Dict[str, Any]:
             "error": str(e)
         }
 
+async def _prepare_recipe(url: str) -> Dict[str, Any]:
+    """
+    Extract, enrich, embed, and save a recipe to MongoDB, leaving the Qdrant write to the caller.
+    
+    Returns:
+        {"point": PointStruct, "result": response dict}, {"result": response dict} for
+        an already-stored recipe, or an error dict
+    """
+    from tools import (
+        extract_recipe_data, enrich_recipe_with_ai, generate_embedding_prompt, find_duplicate_recipe
+    )
+    
+    # A URL that was already stored is returned without scraping or AI calls
+    mongo_store = api.state.mongo
+    stored_recipe = await asyncio.to_thread(mongo_store.get_recipe_by_url, url)
+    if stored_recipe:
+        return {
+            "result": RecipeResult.from_enriched(str(stored_recipe["_id"]), url, stored_recipe, deduped=True).to_dict()
+        }
+    
+    # Extract recipe content
+    recipe_data = await extract_recipe_data(url)
+    if not recipe_data:
+        return {
+            "success": False,
+            "error": f"Could not extract recipe content from URL: {url}"
+        }
+        
+    # Enrich with AI
+    enriched_data = await enrich_recipe_with_ai(recipe_data)
+    
+    # Generate natural language summary (embedding_prompt) for vector search
+    # This matches the TypeScript approach exactly
+    embedding_prompt = await generate_embedding_prompt(enriched_data)
+    
+    # Embeddings use ONLY the embedding_prompt (not the full recipe text), which ensures
+    # identical semantic meaning with the TypeScript implementation.
+    # Concurrent ingestions are coalesced into one embeddings call and one upsert.
+    recipe_vector = await coalesced_embed(embedding_prompt)
+    
+    # A near-identical recipe imported from another URL is returned instead of stored twice
+    duplicate = await find_duplicate_recipe(recipe_vector, url)
+    if duplicate:
+        return {
+            "result": RecipeResult.from_enriched(duplicate["mongo_id"], url, duplicate, deduped=True).to_dict()
+        }
+    
+    # Save to MongoDB with embedding_prompt
+    recipe_id = await asyncio.to_thread(mongo_store.save_recipe, enriched_data, embedding_prompt)
+    # The stored document was replaced, so drop any cached copy
+    recipe_cache.pop(recipe_id, None)
+    
+    vector_store = api.state.vector
+    return {
+        "point": vector_store.build_point(recipe_id, recipe_vector, enriched_data),
+        "result": RecipeResult.from_enriched(recipe_id, url, enriched_data).to_dict()
+    }
+
+async def _begin_bulk_ingest(vector_store) -> bool:
+    """Pause HNSW indexing for a bulk load, or join the pause of one already running."""
+    global _bulk_ingest_active, _bulk_ingest_hnsw_m
+    async with _bulk_ingest_lock:
+        if _bulk_ingest_active == 0:
+            previous_m = await asyncio.to_thread(vector_store.pause_indexing)
+            if previous_m is None:
+                return False
+            _bulk_ingest_hnsw_m = previous_m
+        _bulk_ingest_active += 1
+        return True
+
+async def _end_bulk_ingest(vector_store) -> None:
+    """Leave the shared indexing pause, restoring the saved HNSW config if this was the last bulk load."""
+    global _bulk_ingest_active
+    async with _bulk_ingest_lock:
+        _bulk_ingest_active -= 1
+        if _bulk_ingest_active == 0:
+            await asyncio.to_thread(vector_store.resume_indexing, _bulk_ingest_hnsw_m)
+
+async def _extract_and_store_recipes_bulk(urls: List[str]) -> Dict[str, Any]:
+    """
+    Ingest many recipe URLs at once with HNSW graph building deferred.
+    
+    Indexing is paused (m=0) while recipes are extracted in parallel and written
+    in large non-blocking upserts, then restored so Qdrant builds the graph once.
+    If the pause fails the recipes are still stored, just with indexing left on.
+    
+    Args:
+        urls: The URLs of the webpages containing the recipes
+        
+    Returns:
+        A dictionary with one result per URL, in order
+    """
+    logger.debug("extract_and_store_recipes_bulk called with %s urls", len(urls))
+    vector_store = api.state.vector
+    # Cap concurrent scrapes/LLM calls so a large dump doesn't hit provider rate limits
+    semaphore = asyncio.Semaphore(BULK_INGEST_CONCURRENCY)
+    
+    async def prepare(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await _prepare_recipe(url)
+            except Exception as e:
+                logger.error(f"Error preparing recipe {url}: {e}")
+                return {"success": False, "error": str(e)}
+    
+    paused = await _begin_bulk_ingest(vector_store)
+    try:
+        prepared = await asyncio.gather(*(prepare(url) for url in urls))
+        
+        points = [p["point"] for p in prepared if "point" in p]
+        for start in range(0, len(points), BULK_UPSERT_CHUNK_SIZE):
+            chunk = points[start:start + BULK_UPSERT_CHUNK_SIZE]
+            await asyncio.to_thread(vector_store.upsert_points, chunk, wait=False)
+    finally:
+        if paused:
+            await _end_bulk_ingest(vector_store)
+    
+    results = [p.get("result", p) for p in prepared]
+    return {
+        "success": all(r.get("success", False) for r in results),
+        "results": results
+    }
+
 
 """
 FastAPI Routes (replacing @custom_route decorators)
 """
 
+@api.on_event("startup")
+async def startup():
+    """Bind the shared, pooled clients to app state once per worker."""
+    api.state.mongo = get_mongodb_store()
+    api.state.vector = get_vector_store()
+    api.state.openai = get_openai_http_client()
+    logger.info("Shared clients bound to app state")
+
+@api.on_event("shutdown")
+async def shutdown():
+    """Release pooled HTTP connections and parse workers on shutdown."""
+    from tools import close_async_http_client, close_openai_client, shutdown_parse_pool
+    await drain_background_writes()
+    await close_openai_http_client()
+    await close_openai_client()
+    await close_async_http_client()
+    shutdown_parse_pool()
+
 @api.get("/health")
 async def health_check():
     """Health check endpoint for Railway deployment."""
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "semantic_cache": {
+            "search": search_cache.stats(),
+            "similar": similar_cache.stats()
+        }
+    }
 
 @api.post("/generate-ephemeral-key")
 async def generate_ephemeral_key():
     """Generate an ephemeral API key for client-side OpenAI Realtime API usage."""
     logger.debug("generate_ephemeral_key called")
     try:
-        import httpx
-        from datetime import datetime, timedelta
-        
         # Call OpenAI's ephemeral key generation endpoint
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/realtime/sessions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-realtime-preview-2025-06-03"
-                }
-            )
+        client = api.state.openai
+        response = await client.post(
+            "/v1/realtime/sessions",
+            json={
+                "model": "gpt-4o-realtime-preview-2025-06-03"
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            ephemeral_key = data.get("client_secret", {}).get("value")
             
-            if response.status_code == 200:
-                data = response.json()
-                ephemeral_key = data.get("client_secret", {}).get("value")
-                
-                if ephemeral_key:
-                    logger.info("Successfully generated ephemeral API key")
-                    return {
-                        "success": True,
-                        "api_key": ephemeral_key,
-                        "expires_at": (datetime.now() + timedelta(hours=24)).isoformat()
-                    }
-                else:
-                    logger.error("No ephemeral key found in response")
-                    return {
-                        "success": False,
-                        "error": "No ephemeral key found in OpenAI response"
-                    }
+            if ephemeral_key:
+                logger.info("Successfully generated ephemeral API key")
+                return {
+                    "success": True,
+                    "api_key": ephemeral_key,
+                    "expires_at": (datetime.now() + timedelta(hours=24)).isoformat()
+                }
             else:
-                logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
+                logger.error("No ephemeral key found in response")
                 return {
                     "success": False,
-                    "error": f"OpenAI API error: {response.status_code}"
+                    "error": "No ephemeral key found in OpenAI response"
                 }
+        else:
+            logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
+            return {
+                "success": False,
+                "error": f"OpenAI API error: {response.status_code}"
+            }
         
     except Exception as e:
         logger.error(f"Failed to generate ephemeral key: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -323,14 +619,20 @@ async def get_recipe_by_id_endpoint(recipe_id: str):
     """Get a recipe by its ID and return it as JSON."""
     try:
         recipe = await _get_recipe_by_id(recipe_id)
-        return {
+        if recipe is None:
+            return RecipeJSONResponse(
+                {"success": False, "error": f"Recipe with ID '{recipe_id}' not found"},
+                status_code=404
+            )
+        
+        return RecipeJSONResponse({
             "success": True,
             "recipe": recipe
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error fetching recipe {recipe_id}: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": f"Failed to fetch recipe: {str(e)}"},
             status_code=500
         )
@@ -344,13 +646,18 @@ async def search_recipes_endpoint(request: Request):
         query = body.get("query")
         
         if not query:
-            return JSONResponse(
+            return RecipeJSONResponse(
                 {"success": False, "error": "Missing 'query' parameter"},
                 status_code=400
             )
         
         # Call the search_recipes implementation function
-        recipes = await _search_recipes(query)
+        recipes = await _search_recipes(
+            query,
+            limit=int(body.get("limit", 50)),
+            offset=int(body.get("offset", 0)),
+            fields=body.get("fields")
+        )
         
         return {
             "success": True,
@@ -359,24 +666,28 @@ async def search_recipes_endpoint(request: Request):
         
     except Exception as e:
         logger.error(f"Error in search_recipes_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
 
 @api.get("/similar-recipes/{recipe_id}")
-async def get_similar_recipes_endpoint(recipe_id: str):
+async def get_similar_recipes_endpoint(
+    recipe_id: str,
+    limit: int = 5,
+    fields: Optional[List[str]] = Query(None)
+):
     """Get recipes similar to a specific recipe."""
-    logger.debug(f"get_similar_recipes_endpoint called with recipe_id: '{recipe_id}'")
+    logger.debug("get_similar_recipes_endpoint called with recipe_id: '%s'", recipe_id)
     try:
         if not recipe_id:
-            return JSONResponse(
+            return RecipeJSONResponse(
                 {"success": False, "error": "Missing recipe_id parameter"},
                 status_code=400
             )
         
         # Call the get_similar_recipes implementation function
-        similar_recipes = await _get_similar_recipes(recipe_id)
+        similar_recipes = await _get_similar_recipes(recipe_id, limit=limit, fields=fields)
         
         return {
             "success": True,
@@ -385,7 +696,7 @@ async def get_similar_recipes_endpoint(recipe_id: str):
         
     except Exception as e:
         logger.error(f"Error in get_similar_recipes_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -399,7 +710,7 @@ async def find_similar_recipes_from_url_endpoint(request: Request):
         recipe_url = body.get("recipe_url")
         
         if not recipe_url:
-            return JSONResponse(
+            return RecipeJSONResponse(
                 {"success": False, "error": "Missing 'recipe_url' parameter"},
                 status_code=400
             )
@@ -414,7 +725,7 @@ async def find_similar_recipes_from_url_endpoint(request: Request):
         
     except Exception as e:
         logger.error(f"Error in find_similar_recipes_from_url_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -428,7 +739,7 @@ async def extract_and_store_recipe_endpoint(request: Request):
         url = body.get("url")
         
         if not url:
-            return JSONResponse(
+            return RecipeJSONResponse(
                 {"success": False, "error": "Missing 'url' parameter"},
                 status_code=400
             )
@@ -440,7 +751,30 @@ async def extract_and_store_recipe_endpoint(request: Request):
         
     except Exception as e:
         logger.error(f"Error in extract_and_store_recipe_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
+            {"success": False, "error": str(e)},
+            status_code=500
+        )
+
+@api.post("/extract-and-store-recipes")
+async def extract_and_store_recipes_bulk_endpoint(request: Request):
+    """Extract, enrich, and store many recipes at once."""
+    logger.debug("extract_and_store_recipes_bulk_endpoint called")
+    try:
+        body = await request.json()
+        urls = body.get("urls")
+        
+        if not urls or not isinstance(urls, list):
+            return RecipeJSONResponse(
+                {"success": False, "error": "Missing 'urls' parameter"},
+                status_code=400
+            )
+        
+        return await _extract_and_store_recipes_bulk(urls)
+        
+    except Exception as e:
+        logger.error(f"Error in extract_and_store_recipes_bulk_endpoint: {e}")
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -448,20 +782,20 @@ async def extract_and_store_recipe_endpoint(request: Request):
 @api.post("/user/{user_id}/recipe/{recipe_id}")
 async def save_recipe_for_user_endpoint(user_id: str, recipe_id: str):
     """Save a recipe for a specific user."""
-    logger.debug(f"save_recipe_for_user_endpoint called with user_id: '{user_id}', recipe_id: '{recipe_id}'")
+    logger.debug("save_recipe_for_user_endpoint called with user_id: '%s', recipe_id: '%s'", user_id, recipe_id)
     try:
-        mongo_store = get_mongodb_store()
+        mongo_store = api.state.mongo
         mongo_store.save_recipe_for_user(user_id, recipe_id)
         return {"success": True, "message": "Recipe saved successfully"}
         
     except Exception as e:
         logger.error(f"Error in save_recipe_for_user_endpoint: {e}")
         if e.message == f"Recipe {recipe_id} not found":
-            return JSONResponse(
+            return RecipeJSONResponse(
                 {"success": False, "error": e.message},
                 status_code=404
             )
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -469,7 +803,7 @@ async def save_recipe_for_user_endpoint(user_id: str, recipe_id: str):
 @api.get("/user/{user_id}/recipes")
 async def get_user_saved_recipes_endpoint(user_id: str, page: int = 1, limit: int = 20):
     """Get saved recipes for a specific user with pagination."""
-    logger.debug(f"get_user_saved_recipes_endpoint called with user_id: '{user_id}', page: {page}, limit: {limit}")
+    logger.debug("get_user_saved_recipes_endpoint called with user_id: '%s', page: %s, limit: %s", user_id, page, limit)
     try:
         # Validate pagination parameters
         if page < 1:
@@ -477,7 +811,7 @@ async def get_user_saved_recipes_endpoint(user_id: str, page: int = 1, limit: in
         if limit < 1 or limit > 100:
             limit = 20
         
-        mongo_store = get_mongodb_store()
+        mongo_store = api.state.mongo
         result = mongo_store.get_user_saved_recipes_paginated(user_id, page, limit)
         
         return {
@@ -495,7 +829,7 @@ async def get_user_saved_recipes_endpoint(user_id: str, page: int = 1, limit: in
         
     except Exception as e:
         logger.error(f"Error in get_user_saved_recipes_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -503,23 +837,23 @@ async def get_user_saved_recipes_endpoint(user_id: str, page: int = 1, limit: in
 @api.get("/user/{user_id}/recipe/{recipe_id}")
 async def get_user_recipe_endpoint(user_id: str, recipe_id: str):
     """Get a specific recipe for a user (if they have it saved)."""
-    logger.debug(f"get_user_recipe_endpoint called with user_id: '{user_id}', recipe_id: '{recipe_id}'")
+    logger.debug("get_user_recipe_endpoint called with user_id: '%s', recipe_id: '%s'", user_id, recipe_id)
     try:
-        mongo_store = get_mongodb_store()
+        mongo_store = api.state.mongo
         
         # Get the recipe data
         recipe = mongo_store.get_recipe(recipe_id)
         if recipe:
-            return {"success": True, "data": recipe}
+            return RecipeJSONResponse({"success": True, "data": recipe})
         else:
-            return JSONResponse(
+            return RecipeJSONResponse(
                 {"success": False, "error": "Recipe not found"},
                 status_code=404
             )
         
     except Exception as e:
         logger.error(f"Error in get_user_recipe_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -527,9 +861,9 @@ async def get_user_recipe_endpoint(user_id: str, recipe_id: str):
 @api.delete("/user/{user_id}/recipe/{recipe_id}")
 async def remove_saved_recipe_endpoint(user_id: str, recipe_id: str):
     """Remove a saved recipe for a specific user."""
-    logger.debug(f"remove_saved_recipe_endpoint called with user_id: '{user_id}', recipe_id: '{recipe_id}'")
+    logger.debug("remove_saved_recipe_endpoint called with user_id: '%s', recipe_id: '%s'", user_id, recipe_id)
     try:
-        mongo_store = get_mongodb_store()
+        mongo_store = api.state.mongo
         success = mongo_store.remove_saved_recipe(user_id, recipe_id)
         
         if success:
@@ -539,7 +873,7 @@ async def remove_saved_recipe_endpoint(user_id: str, recipe_id: str):
         
     except Exception as e:
         logger.error(f"Error in remove_saved_recipe_endpoint: {e}")
-        return JSONResponse(
+        return RecipeJSONResponse(
             {"success": False, "error": str(e)},
             status_code=500
         )
@@ -551,11 +885,10 @@ MCP Resources
 @mcp.resource("data://recipe/{recipe_id}")
 async def recipe_resource(recipe_id: str) -> dict:
     """Fetch a recipe from MongoDB by its ID."""
-    logger.debug(f"recipe_resource called with recipe_id: '{recipe_id}'")
+    logger.debug("recipe_resource called with recipe_id: '%s'", recipe_id)
     try:
-        # Get the recipe from MongoDB
-        mongo_store = get_mongodb_store()
-        recipe = await mongo_store.get_recipe(recipe_id)
+        # Get the recipe from MongoDB (or the recipe cache)
+        recipe = await _get_recipe_cached(recipe_id)
         
         if not recipe:
             raise ValueError(f"Recipe with ID '{recipe_id}' not found")
@@ -572,17 +905,39 @@ MCP Tools called by backend agents connecting to this MCP server.
 @mcp.tool
 async def get_recipe_by_id(recipe_id: str) -> dict:
     """Fetch a recipe from MongoDB by its ID."""
-    return await _get_recipe_by_id(recipe_id)
+    recipe = await _get_recipe_by_id(recipe_id)
+    if recipe is None:
+        raise ValueError(f"Recipe with ID '{recipe_id}' not found")
+    return recipe
 
 @mcp.tool
-async def search_recipes(query: str) -> List[Dict[str, Any]]:
-    """Search for recipes using natural language queries with vector similarity."""
-    return await _search_recipes(query)
+async def search_recipes(
+    query: str,
+    limit: int = 5,
+    offset: int = 0,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Search for recipes using natural language queries with vector similarity.
+    
+    Pass fields (e.g. ["title", "summary", "cuisine", "difficulty_level"]) to skip
+    ingredients and instructions when only ranking recipes; use offset to page.
+    """
+    return await _search_recipes(query, limit=limit, offset=offset, fields=fields)
 
 @mcp.tool
-async def get_similar_recipes(recipe_id: str) -> List[Dict[str, Any]]:
-    """Find recipes similar to a specific recipe using vector similarity."""
-    return await _get_similar_recipes(recipe_id)
+async def get_similar_recipes(
+    recipe_id: str,
+    limit: int = 5,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Find recipes similar to a specific recipe using vector similarity.
+    
+    Pass fields (e.g. ["title", "summary", "cuisine", "difficulty_level"]) to return
+    lightweight recipes.
+    """
+    return await _get_similar_recipes(recipe_id, limit=limit, fields=fields)
 
 @mcp.tool
 async def find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]]:
@@ -594,10 +949,15 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
     """Extract recipe content from a URL, enrich with AI, and store in databases."""
     return await _extract_and_store_recipe(url)
 
+@mcp.tool
+async def extract_and_store_recipes_bulk(urls: List[str]) -> Dict[str, Any]:
+    """Extract, enrich, and store many recipes at once, deferring vector indexing until the end."""
+    return await _extract_and_store_recipes_bulk(urls)
+
 @mcp.tool
 async def save_recipe_for_user(user_id: str, recipe_id: str) -> Dict[str, Any]:
     """Save a recipe for a specific user."""
-    mongo_store = get_mongodb_store()
+    mongo_store = api.state.mongo
     success = mongo_store.save_recipe_for_user(user_id, recipe_id)
     
     if success:
@@ -608,7 +968,7 @@ async def save_recipe_for_user(user_id: str, recipe_id: str) -> Dict[str, Any]:
 @mcp.tool
 async def get_user_saved_recipes(user_id: str) -> Dict[str, Any]:
     """Get all saved recipes for a specific user."""
-    mongo_store = get_mongodb_store()
+    mongo_store = api.state.mongo
     saved_recipes = mongo_store.get_user_saved_recipes_paginated(user_id)
     
     return {"success": True, "data": saved_recipes}
@@ -616,7 +976,7 @@ async def get_user_saved_recipes(user_id: str) -> Dict[str, Any]:
 @mcp.tool
 async def remove_saved_recipe(user_id: str, recipe_id: str) -> Dict[str, Any]:
     """Remove a saved recipe for a specific user."""
-    mongo_store = get_mongodb_store()
+    mongo_store = api.state.mongo
     success = mongo_store.remove_saved_recipe(user_id, recipe_id)
     
     if success:
@@ -627,7 +987,7 @@ async def remove_saved_recipe(user_id: str, recipe_id: str) -> Dict[str, Any]:
 @mcp.tool
 async def is_recipe_saved_for_user(user_id: str, recipe_id: str) -> Dict[str, Any]:
     """Check if a recipe is saved for a specific user."""
-    mongo_store = get_mongodb_store()
+    mongo_store = api.state.mongo
     is_saved = mongo_store.is_recipe_saved_for_user(user_id, recipe_id)
     
     return {"success": True, "is_saved": is_saved}
@@ -638,7 +998,6 @@ api.mount("/mcp", mcp.http_app())
 if __name__ == "__main__":
     # Validate configuration
     try:
-        from config import config
         config.validate()
         logger.info("Configuration validated successfully")
     except ValueError as e:
@@ -0,0 +1,126 @@
+"""Unit tests for request batching and single-flight coalescing."""
+
+import asyncio
+
+from batching import AsyncBatcher, SingleFlight
+
+
+class DoublingBatcher(AsyncBatcher):
+    """Batcher that doubles each item and records the batches it saw."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    async def process_batch(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+class FailingBatcher(AsyncBatcher):
+    """Batcher whose batches always fail."""
+
+    async def process_batch(self, items):
+        raise RuntimeError("backend down")
+
+
+class TestAsyncBatcher:
+    """Test cases for AsyncBatcher."""
+
+    def test_results_fan_out_in_order(self):
+        """Test that concurrent submissions share one batch and each get their own result."""
+        batcher = DoublingBatcher(max_batch_size=10, max_wait_ms=5)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+        assert asyncio.run(run()) == [0, 2, 4, 6]
+        assert batcher.batches == [[0, 1, 2, 3]]
+
+    def test_full_batch_flushes_immediately(self):
+        """Test that reaching max_batch_size splits the work into batches."""
+        batcher = DoublingBatcher(max_batch_size=2, max_wait_ms=1000)
+
+        async def run():
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+            )
+
+        assert asyncio.run(run()) == [0, 2, 4, 6]
+        assert batcher.batches == [[0, 1], [2, 3]]
+
+    def test_error_reaches_every_caller(self):
+        """Test that a failed batch raises in every waiting caller."""
+        batcher = FailingBatcher(max_batch_size=10, max_wait_ms=5)
+
+        async def run():
+            return await asyncio.gather(
+                *(batcher.submit(i) for i in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+
+        assert len(results) == 3
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_calls_share_one_run(self):
+        """Test that callers with the same key share one call."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value.upper()
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", work, "tacos") for _ in range(5)))
+
+        assert asyncio.run(run()) == ["TACOS"] * 5
+        assert calls == ["tacos"]
+
+    def test_distinct_keys_run_separately(self):
+        """Test that different keys are not coalesced."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        async def run():
+            return await asyncio.gather(flight.do("a", work, "a"), flight.do("b", work, "b"))
+
+        assert asyncio.run(run()) == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_error_is_shared_and_key_released(self):
+        """Test that waiters see the error and a later call runs again."""
+        flight = SingleFlight()
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def succeeding():
+            calls.append(2)
+            return "ok"
+
+        async def run():
+            results = await asyncio.gather(
+                *(flight.do("key", failing) for _ in range(3)), return_exceptions=True
+            )
+            return results, await flight.do("key", succeeding)
+
+        results, retry = asyncio.run(run())
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert retry == "ok"
+        assert calls == [1, 2]
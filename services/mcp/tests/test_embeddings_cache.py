@@ -0,0 +1,57 @@
+"""Unit tests for the two-tier embedding cache."""
+
+import pytest
+
+import embeddings_cache
+from embeddings_cache import get_cached_embedding, get_persisted_embedding, put_cached_embeddings
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    """Fixture that starts each test with empty tiers and no persistent store."""
+    monkeypatch.setattr(embeddings_cache.config, "EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setattr(embeddings_cache, "_db", None)
+    embeddings_cache._embedding_cache.clear()
+    yield
+    if embeddings_cache._db is not None:
+        embeddings_cache._db.close()
+    embeddings_cache._embedding_cache.clear()
+
+
+@pytest.fixture
+def persistent_cache(monkeypatch, tmp_path):
+    """Fixture that enables the SQLite tier in a temporary directory."""
+    monkeypatch.setattr(embeddings_cache.config, "EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.db"))
+
+
+class TestEmbeddingCache:
+    """Test cases for the embedding cache tiers."""
+
+    def test_miss_then_hit(self):
+        """Test that a stored vector is returned for the same text."""
+        assert get_cached_embedding("tacos") is None
+
+        put_cached_embeddings(["tacos"], [[0.5, 0.25]])
+
+        assert get_cached_embedding("tacos") == [0.5, 0.25]
+        assert get_cached_embedding("burritos") is None
+
+    def test_persistent_tier_disabled_without_path(self):
+        """Test that the SQLite tier is skipped when no path is configured."""
+        put_cached_embeddings(["tacos"], [[0.5, 0.25]])
+
+        assert get_persisted_embedding("tacos") is None
+
+    def test_persistent_tier_survives_memory_eviction(self, persistent_cache):
+        """Test that a vector evicted from memory is read back and promoted."""
+        put_cached_embeddings(["tacos"], [[0.5, 0.25]])
+        embeddings_cache._embedding_cache.clear()
+
+        assert get_cached_embedding("tacos") is None
+        assert get_persisted_embedding("tacos") == [0.5, 0.25]
+        assert get_cached_embedding("tacos") == [0.5, 0.25]
+
+    def test_key_depends_on_model(self):
+        """Test that the same text under another model gets a different key."""
+        assert embeddings_cache.embedding_cache_key("tacos", "model-a") != \
+            embeddings_cache.embedding_cache_key("tacos", "model-b")
@@ -0,0 +1,78 @@
+"""Unit tests for vectorized re-ranking."""
+
+import numpy as np
+
+from ranking import rerank, split_vectors
+
+
+def unit_rows(*rows):
+    """Build a float32 matrix of unit-length rows."""
+    matrix = np.asarray(rows, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class TestRerank:
+    """Test cases for rerank."""
+
+    def test_orders_by_similarity(self):
+        """Test that candidates come back best first."""
+        candidates = unit_rows([0, 1], [1, 1], [1, 0])
+
+        order = rerank(candidates, [1, 0])
+
+        assert order.tolist() == [2, 1, 0]
+
+    def test_excluded_candidates_are_dropped(self):
+        """Test that excluded candidates are removed, not just demoted."""
+        candidates = unit_rows([0, 1], [1, 1], [1, 0])
+
+        order = rerank(candidates, [1, 0], exclude=np.array([False, False, True]))
+
+        assert order.tolist() == [1, 0]
+
+    def test_top_k_matches_full_sort(self):
+        """Test that the partial sort returns the head of the full ordering."""
+        rng = np.random.default_rng(0)
+        candidates = unit_rows(*rng.normal(size=(50, 8)))
+        query = unit_rows(rng.normal(size=8))[0]
+
+        full = rerank(candidates, query)
+        top = rerank(candidates, query, top_k=5)
+
+        assert top.tolist() == full[:5].tolist()
+
+    def test_lexical_scores_are_blended(self):
+        """Test that lexical scores can reorder close candidates."""
+        candidates = unit_rows([1, 0.1], [1, 0])
+
+        vector_only = rerank(candidates, [1, 0])
+        blended = rerank(candidates, [1, 0], lexical_scores=np.array([1.0, 0.0]), alpha=0.5)
+
+        assert vector_only.tolist() == [1, 0]
+        assert blended.tolist() == [0, 1]
+
+    def test_no_candidates(self):
+        """Test reranking an empty candidate set."""
+        assert rerank(np.zeros((0, 0), dtype=np.float32), [1, 0]).tolist() == []
+
+
+class TestSplitVectors:
+    """Test cases for split_vectors."""
+
+    def test_pops_vectors_into_matrix(self):
+        """Test that vectors move from the recipes into one matrix."""
+        recipes = [{"id": "a", "vector": [1, 0]}, {"id": "b", "vector": [0, 1]}]
+
+        recipes, vectors = split_vectors(recipes)
+
+        assert recipes == [{"id": "a"}, {"id": "b"}]
+        assert vectors.dtype == np.float32
+        assert vectors.shape == (2, 2)
+        assert vectors.flags["C_CONTIGUOUS"]
+
+    def test_no_recipes(self):
+        """Test splitting an empty result list."""
+        recipes, vectors = split_vectors([])
+
+        assert recipes == []
+        assert vectors.shape == (0, 0)
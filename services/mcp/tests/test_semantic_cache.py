@@ -0,0 +1,106 @@
+"""Unit tests for the in-process semantic cache."""
+
+import pytest
+from unittest.mock import patch
+
+from semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def clock():
+    """Fixture for a controllable monotonic clock."""
+    now = [1000.0]
+    with patch('semantic_cache.time.monotonic', side_effect=lambda: now[0]):
+        yield now
+
+
+@pytest.fixture
+def cache(clock):
+    """Fixture for a small 3-dimensional cache."""
+    return SemanticCache(maxsize=2, ttl=60, tau=0.97, dim=3)
+
+
+class TestSemanticCacheLookup:
+    """Test cases for hits and misses."""
+
+    def test_empty_cache_misses(self, cache):
+        """Test lookup on an empty cache."""
+        assert cache.get([1, 0, 0]) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_similar_vector_hits(self, cache):
+        """Test that a vector within tau returns the cached value."""
+        cache.put([1, 0, 0], "tacos")
+
+        # Scale doesn't matter and a small perturbation stays above tau
+        assert cache.get([2, 0.1, 0]) == "tacos"
+        assert cache.stats() == {"size": 1, "hits": 1, "misses": 0, "hit_rate": 1.0}
+
+    def test_dissimilar_vector_misses(self, cache):
+        """Test that a vector below tau misses."""
+        cache.put([1, 0, 0], "tacos")
+
+        assert cache.get([0, 1, 0]) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_rejected_value_counts_as_miss(self, cache):
+        """Test that a value refused by accept is a miss."""
+        cache.put([1, 0, 0], (5, ["a"] * 5))
+
+        assert cache.get([1, 0, 0], accept=lambda entry: entry[0] >= 10) is None
+        assert cache.get([1, 0, 0], accept=lambda entry: entry[0] >= 5) == (5, ["a"] * 5)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_expired_entry_misses(self, cache, clock):
+        """Test that entries older than the TTL never hit."""
+        cache.put([1, 0, 0], "tacos")
+        clock[0] += 61
+
+        assert cache.get([1, 0, 0]) is None
+
+    def test_expired_entry_can_be_refreshed(self, cache, clock):
+        """Test that an entry masked as expired in one lookup hits again once stored anew."""
+        cache.put([1, 0, 0], "old tacos")
+        clock[0] += 61
+        assert cache.get([1, 0, 0]) is None
+
+        cache.put([1, 0, 0], "tacos")
+
+        assert cache.get([1, 0, 0]) == "tacos"
+
+    def test_clear(self, cache):
+        """Test that clear drops every entry."""
+        cache.put([1, 0, 0], "tacos")
+        cache.clear()
+
+        assert cache.get([1, 0, 0]) is None
+        assert cache.stats()["size"] == 0
+
+
+class TestSemanticCacheStore:
+    """Test cases for slot replacement."""
+
+    def test_similar_vector_replaces_entry(self, cache):
+        """Test that refreshing a near-identical vector reuses its slot."""
+        cache.put([1, 0, 0], (5, ["a"] * 5))
+        cache.put([1, 0.01, 0], (50, ["a"] * 50))
+
+        assert cache.stats()["size"] == 1
+        assert cache.get([1, 0, 0], accept=lambda entry: entry[0] >= 50)[0] == 50
+
+    def test_full_cache_evicts_least_recently_used(self, cache, clock):
+        """Test that a new vector replaces the least recently used entry when full."""
+        cache.put([1, 0, 0], "x")
+        clock[0] += 1
+        cache.put([0, 1, 0], "y")
+        clock[0] += 1
+        # Touch x so y becomes the least recently used entry
+        assert cache.get([1, 0, 0]) == "x"
+        clock[0] += 1
+        cache.put([0, 0, 1], "z")
+
+        assert cache.stats()["size"] == 2
+        assert cache.get([1, 0, 0]) == "x"
+        assert cache.get([0, 0, 1]) == "z"
+        assert cache.get([0, 1, 0]) is None
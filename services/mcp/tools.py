@@ -3,58 +3,164 @@
 import logging
 import sys
 import os
-import uuid
 from pydantic import BaseModel
+import httpx
 import requests
-from typing import Dict, Any, List, Optional
-from bs4 import BeautifulSoup
+import requests.adapters
+from typing import Any, Dict, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
 import json
+import orjson
 import re
-from openai import OpenAI
+from openai import AsyncOpenAI
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # Add the current directory to Python path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
+    from batching import coalesced_embed, search_batcher, store_point_in_background
     from database import get_vector_store, get_mongodb_store
-    from embeddings import get_embeddings, embed_query
     from config import config
+    from schema import RecipeResult
     from prompts.recipe_enrichment import (
         RECIPE_ENRICHMENT_PROMPT,
         RECIPE_ENRICHMENT_SYSTEM_PROMPT,
         RECIPE_ENRICHMENT_JSON_SCHEMA
     )
+    from prompts.embedding_prompt import EMBEDDING_PROMPT_SYSTEM_PROMPT
 except ImportError:
     # Try relative imports if running as module
+    from .batching import coalesced_embed, search_batcher, store_point_in_background
     from .database import get_vector_store, get_mongodb_store
-    from .embeddings import get_embeddings, embed_query
     from .config import config
+    from .schema import RecipeResult
     from .prompts.recipe_enrichment import (
         RECIPE_ENRICHMENT_PROMPT,
         RECIPE_ENRICHMENT_SYSTEM_PROMPT,
         RECIPE_ENRICHMENT_JSON_SCHEMA
     )
+    from .prompts.embedding_prompt import EMBEDDING_PROMPT_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client for chat completions
-_openai_client: OpenAI = None
+# Initialize OpenAI client for chat completions (async, so calls don't occupy worker threads)
+_openai_client: AsyncOpenAI = None
 
-def get_openai_client() -> OpenAI:
+def get_openai_client() -> AsyncOpenAI:
     """Get or create OpenAI client for chat completions."""
     global _openai_client
     if _openai_client is None:
-        _openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+        _openai_client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
         logger.info("OpenAI chat client initialized")
     return _openai_client
 
-async def search_recipes(query: str) -> List[Dict[str, Any]]:
+async def close_openai_client():
+    """Close the OpenAI chat client's connection pool."""
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+
+# Shared HTTP session for scraping (keeps connections alive between requests)
+_http_session: Optional[requests.Session] = None
+
+def get_http_session() -> requests.Session:
+    """Get or create the pooled HTTP session used to fetch recipe pages."""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        # Size the per-host pool for concurrent ingestion (urllib3 keeps only 10 by default)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        _http_session.mount('https://', adapter)
+        _http_session.mount('http://', adapter)
+        _http_session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+    return _http_session
+
+# Async HTTP/2 client for recipe pages: concurrent fetches from one site share a connection
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get or create the async HTTP client used to fetch recipe pages."""
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }
+        )
+    return _async_http_client
+
+async def close_async_http_client():
+    """Close the async HTTP client."""
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+
+# Worker processes for CPU-bound HTML parsing, so concurrent extractions aren't serialized by the GIL
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool used to parse recipe pages."""
+    global _parse_pool
+    if _parse_pool is None:
+        # Spawn rather than fork: by the time the pool is first used the process already
+        # holds gRPC/HTTP clients and their threads, which are not safe to fork
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=config.RECIPE_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Recipe parse pool started with {config.RECIPE_PARSE_WORKERS} workers")
+    return _parse_pool
+
+def shutdown_parse_pool():
+    """Shut down the recipe parse pool."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+# Recipe time formats: ISO 8601 minutes ("PT5M") or a leading number ("30 minutes")
+_ISO_MINUTES_RE = re.compile(r'PT(\d+)M')
+_LEADING_NUMBER_RE = re.compile(r'(\d+)')
+
+def _parse_time_to_minutes(time_str) -> int:
+    """Parse a recipe time value to minutes."""
+    if not time_str:
+        return 0
+    if isinstance(time_str, int):
+        return time_str
+    if isinstance(time_str, str):
+        match = _ISO_MINUTES_RE.match(time_str) or _LEADING_NUMBER_RE.match(time_str)
+        if match:
+            return int(match.group(1))
+    return 0
+
+async def search_recipes(
+    query: str,
+    limit: int = 5,
+    offset: int = 0,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
     """
     Search for recipes using a natural language query.
     
     Args:
         query: A natural language description of the recipes you want to find
+        limit: Maximum number of recipes to return
+        offset: Number of top results to skip (for pagination)
+        fields: Recipe fields to return, e.g. title, summary, cuisine, difficulty_level;
+            full recipes when omitted
         
     Returns:
         A list of recipes matching the query
@@ -63,12 +169,13 @@ async def search_recipes(query: str) -> List[Dict[str, Any]]:
         logger.info(f"Searching recipes for query: {query}")
         
         # Get embeddings for the query
-        embeddings_client = get_embeddings()
-        query_vector = embed_query(query)
+        query_vector = await coalesced_embed(query)
         
         # Search vector store (Qdrant)
         vector_store = get_vector_store()
-        recipes = vector_store.search_recipes(query_vector, limit=5)
+        recipes = await search_batcher.submit(
+            vector_store.build_search_request(query_vector, limit=limit, offset=offset, fields=fields)
+        )
         
         logger.info(f"Found {len(recipes)} recipes for query: {query}")
         return recipes
@@ -90,27 +197,30 @@ async def get_similar_recipes(recipe_id: str) -> List[Dict[str, Any]]:
     try:
         logger.info(f"Finding similar recipes for recipe ID: {recipe_id}")
         
-        # Get the original recipe from MongoDB
+        # Get the original recipe from MongoDB while querying by its stored Qdrant
+        # point (no embedding call needed); the two lookups are independent
         mongo_store = get_mongodb_store()
-        original_recipe = mongo_store.get_recipe(recipe_id)
+        vector_store = get_vector_store()
+        original_recipe, similar_recipes = await asyncio.gather(
+            asyncio.to_thread(mongo_store.get_recipe, recipe_id),
+            asyncio.to_thread(vector_store.recommend_recipes, recipe_id, limit=5)
+        )
         
         if not original_recipe:
             logger.warning(f"Recipe not found: {recipe_id}")
             return []
         
-        # Create a text representation of the recipe for embedding
-        recipe_text = f"{original_recipe.get('title', '')} {original_recipe.get('summary', '')} {' '.join(original_recipe.get('ingredients', []))}"
-        
-        # Get embeddings for the recipe
-        embeddings_client = get_embeddings()
-        recipe_vector = embed_query(recipe_text)
-        
-        # Search for similar recipes using vector similarity (Qdrant)
-        vector_store = get_vector_store()
-        similar_recipes = vector_store.search_recipes(recipe_vector, limit=5)
-        
-        # Filter out the original recipe from results
-        similar_recipes = [r for r in similar_recipes if r.get('_id') != recipe_id]
+        if similar_recipes is None:
+            # No Qdrant point for this recipe: embed its stored embedding_prompt instead
+            recipe_text = original_recipe.get('embedding_prompt')
+            if not recipe_text:
+                logger.warning(f"Recipe has no vector and no embedding_prompt: {recipe_id}")
+                return []
+            
+            recipe_vector = await coalesced_embed(recipe_text)
+            similar_recipes = await search_batcher.submit(
+                vector_store.build_search_request(recipe_vector, limit=5, exclude_ids=[recipe_id])
+            )
         
         logger.info(f"Found {len(similar_recipes)} similar recipes for recipe ID: {recipe_id}")
         return similar_recipes
@@ -132,23 +242,29 @@ async def find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]]
     try:
         logger.info(f"Finding similar recipes for URL: {recipe_url}")
         
+        # Already-ingested URLs reuse the stored recipe's vector
+        mongo_store = get_mongodb_store()
+        stored_recipe = await asyncio.to_thread(mongo_store.get_recipe_by_url, recipe_url)
+        
+        if stored_recipe:
+            return await get_similar_recipes(str(stored_recipe['_id']))
+        
         # Extract recipe content from URL
         recipe_data = await extract_recipe_data(recipe_url)
         if not recipe_data:
             logger.warning(f"Could not extract recipe content from URL: {recipe_url}")
             return []
         
-        
-        # Create text representation for embedding
-        recipe_text = f"{recipe_data.get('title', '')} {recipe_data.get('summary', '')} {' '.join(recipe_data.get('ingredients', []))}"
-        
-        # Get embeddings for the recipe
-        embeddings_client = get_embeddings()
-        recipe_vector = embed_query(recipe_text)
+        # Enrich and embed the embedding_prompt, matching how stored recipes are embedded
+        enriched_data = await enrich_recipe_with_ai(recipe_data)
+        embedding_prompt = await generate_embedding_prompt(enriched_data)
+        recipe_vector = await coalesced_embed(embedding_prompt)
         
         # Search for similar recipes using vector similarity (Qdrant)
         vector_store = get_vector_store()
-        similar_recipes = vector_store.search_recipes(recipe_vector, limit=5)
+        similar_recipes = await search_batcher.submit(
+            vector_store.build_search_request(recipe_vector, limit=5)
+        )
         
         logger.info(f"Found {len(similar_recipes)} similar recipes for URL: {recipe_url}")
         return similar_recipes
@@ -157,6 +273,26 @@ async def find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]]
         logger.error(f"Error finding similar recipes from URL: {e}")
         return []
 
+async def find_duplicate_recipe(recipe_vector: List[float], url: str) -> Optional[Dict[str, Any]]:
+    """
+    Find an already-stored recipe from another URL that is nearly identical to a new one.
+    
+    Args:
+        recipe_vector: Embedding of the new recipe
+        url: The new recipe's URL (a stored copy from the same URL is being refreshed, not duplicated)
+        
+    Returns:
+        The stored recipe's payload (with mongo_id and score), or None
+    """
+    vector_store = get_vector_store()
+    hits = await search_batcher.submit(
+        vector_store.build_search_request(recipe_vector, limit=1, fields=["title", "summary", "link"])
+    )
+    if hits and hits[0]["score"] >= config.RECIPE_DEDUP_THRESHOLD and hits[0].get("link") != url:
+        logger.info(f"Recipe from {url} duplicates stored recipe {hits[0]['mongo_id']} (score {hits[0]['score']:.3f})")
+        return hits[0]
+    return None
+
 async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
     """
     Extract recipe content from a URL, enrich with AI, store in MongoDB, and add to vector database.
@@ -170,6 +306,12 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
     try:
         logger.info(f"Extracting and storing recipe from URL: {url}")
         
+        # A URL that was already stored is returned without scraping or AI calls
+        mongo_store = get_mongodb_store()
+        stored_recipe = await asyncio.to_thread(mongo_store.get_recipe_by_url, url)
+        if stored_recipe:
+            return RecipeResult.from_enriched(str(stored_recipe["_id"]), url, stored_recipe, deduped=True).to_dict()
+        
         # Extract recipe content
         recipe_data = await extract_recipe_data(url)
         if not recipe_data:
@@ -181,26 +323,22 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
         # Enrich with AI
         enriched_data = await enrich_recipe_with_ai(recipe_data)
         
-        # Save to MongoDB
-        mongo_store = get_mongodb_store()
-        recipe_id = mongo_store.save_recipe(enriched_data)
+        # Embed the embedding_prompt, the same vector definition the server stores,
+        # so points from either path are comparable in the shared collection
+        embedding_prompt = await generate_embedding_prompt(enriched_data)
+        recipe_vector = await coalesced_embed(embedding_prompt)
+        duplicate = await find_duplicate_recipe(recipe_vector, url)
+        if duplicate:
+            return RecipeResult.from_enriched(duplicate["mongo_id"], url, duplicate, deduped=True).to_dict()
         
-        # Generate embeddings and save to vector store (Qdrant)
-        embeddings_client = get_embeddings()
-        recipe_text = f"{enriched_data.get('title', '')} {enriched_data.get('summary', '')} {' '.join(enriched_data.get('ingredients', []))}"
-        recipe_vector = embed_query(recipe_text)
+        recipe_id = await asyncio.to_thread(mongo_store.save_recipe, enriched_data, embedding_prompt)
         
+        # Save to vector store (Qdrant) once both the ID and vector are available
         vector_store = get_vector_store()
-        vector_store.add_recipe(recipe_id, recipe_vector, enriched_data)
+        store_point_in_background(vector_store.build_point(recipe_id, recipe_vector, enriched_data))
         
         logger.info(f"Successfully extracted and stored recipe: {recipe_id}")
-        return {
-            "success": True,
-            "recipe_id": recipe_id,
-            "title": enriched_data.get("title", "Unknown"),
-            "url": url,
-            "summary": enriched_data.get("summary", "")
-        }
+        return RecipeResult.from_enriched(recipe_id, url, enriched_data).to_dict()
         
     except Exception as e:
         logger.error(f"Error extracting and storing recipe: {e}")
@@ -232,25 +370,8 @@ async def generate_embedding_prompt(recipe_data: Dict[str, Any]) -> str:
         prep_time = recipe_data.get('prep_time', '0')
         cook_time = recipe_data.get('cook_time', '0')
         
-        def parse_time_to_minutes(time_str):
-            if not time_str:
-                return 0
-            if isinstance(time_str, int):
-                return time_str
-            if isinstance(time_str, str):
-                # Handle PT5M format
-                import re
-                match = re.match(r'PT(\d+)M', time_str)
-                if match:
-                    return int(match.group(1))
-                # Handle "30 minutes" format
-                match = re.match(r'(\d+)', time_str)
-                if match:
-                    return int(match.group(1))
-            return 0
-        
-        prep_time_minutes = parse_time_to_minutes(prep_time)
-        cook_time_minutes = parse_time_to_minutes(cook_time)
+        prep_time_minutes = _parse_time_to_minutes(prep_time)
+        cook_time_minutes = _parse_time_to_minutes(cook_time)
         
         # Get relevance scores
         relevance = recipe_data.get('relevance', {})
@@ -265,18 +386,6 @@ async def generate_embedding_prompt(recipe_data: Dict[str, Any]) -> str:
         carbs = nutrients.get('carbohydrateContent', 'N/A') if isinstance(nutrients, dict) else 'N/A'
         fat = nutrients.get('fatContent', 'N/A') if isinstance(nutrients, dict) else 'N/A'
         
-        system_prompt = """You are a friendly home cook summarizing recipes for a smart recommendation system.
-
-Write a **2–3 sentence summary** that:
-- Explains what the dish is and why it's appealing (e.g., bold flavor, easy cleanup, kid-friendly)
-- Highlights key features like main-ingredients, cooking method, cuisine, and type of meal (e.g., main, salad, soup, side, dessert)
-- Suggests an ideal context for the recipe: occasion (e.g., weeknight dinner, casual party), season (e.g., summer, fall), or weather (e.g., chilly day comfort food)
-- Optionally comment on health profile (e.g., high protein, low-carb, veggie-packed)
-- Comment on the recipe's difficulty level (e.g., easy, medium, hard) and choose an ideal persona (e.g., family, single, health)
-- Feels conversational and natural — as if you're texting a friend who wants ideas
-
-Avoid repeating the recipe title. Be concise, and expressive."""
-
         # Prepare instructions text to avoid f-string backslash issue
         instructions_text = '\n'.join(recipe_data.get('instruction', []))
         
@@ -296,11 +405,10 @@ Nutrition (per serving): {calories} kcal, {protein} protein, {carbs} carbs, {fat
 
         # Call OpenAI API to generate the natural language summary
         client = get_openai_client()
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": EMBEDDING_PROMPT_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=150,
@@ -385,7 +493,7 @@ def fetch_tiktok_oembed(url: str) -> Optional[Dict[str, Any]]:
             'Accept': 'application/json'
         }
         
-        response = requests.get(oembed_url, headers=headers, timeout=10)
+        response = get_http_session().get(oembed_url, headers=headers, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -419,8 +527,7 @@ async def parse_tiktok_description_with_ai(description: str) -> Optional[Dict[st
         client = get_openai_client()
     
     
-        response = await asyncio.to_thread(
-            client.responses.parse,
+        response = await client.responses.parse(
             model="gpt-4o-mini",
             input=[
                 {"role": "system", "content": "Extract the recipe information."},
@@ -490,13 +597,10 @@ async def parse_tiktok_recipe(url: str) -> Optional[Dict[str, Any]]:
 def extract_pinterest_visit_link(url: str) -> Optional[str]:
     """Extract the 'visit site' link from a Pinterest pin page."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
         
         # TODO: Heuristic 1: find the anchor tag with the text "Visit Site"
         # For some reason this donest work with https://www.pinterest.com/pin/214343263513321653/
@@ -511,7 +615,7 @@ def extract_pinterest_visit_link(url: str) -> Optional[str]:
         link = None
         for script in scripts:
             try:
-                data = json.loads(script.string)
+                data = orjson.loads(script.string or "")
                 if isinstance(data, dict) and data.get('@type') == 'SocialMediaPosting':
                     webpage = data.get('sharedContent', {})
                     if webpage.get('@type') == 'WebPage':
@@ -519,7 +623,7 @@ def extract_pinterest_visit_link(url: str) -> Optional[str]:
                 if isinstance(data, dict) and data.get('@type') == 'Recipe':
                     # the pintrest url actually has the JSON-LD data
                     link = url
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 continue
         
         return link
@@ -559,23 +663,49 @@ def parse_pinterest_recipe(url: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Error parsing Pinterest recipe: {e}")
         return None
 
-def parse_recipe_from_jsonld(url: str) -> Optional[Dict[str, Any]]:
-    """Parse regular recipe from URL using web scraping."""
+# Recipe pages are only read for their JSON-LD blocks: first by scanning the raw bytes,
+# then (if that finds no recipe) through a DOM parse limited to those script tags
+_JSON_LD_RE = re.compile(
+    rb'<script[^>]*type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_JSON_LD_SCRIPTS = SoupStrainer('script', type='application/ld+json')
+
+def fetch_recipe_html(url: str) -> Optional[bytes]:
+    """Fetch the raw HTML of a recipe page."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(url, timeout=10)
         response.raise_for_status()
+        return response.content
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract JSON-LD structured data
-        json_ld_data = extract_json_ld_recipe(soup)
-        if json_ld_data:
-            return json_ld_data
-        
+    except Exception as e:
+        logger.error(f"Error fetching recipe page {url}: {e}")
         return None
+
+def parse_recipe_html(html: bytes) -> Optional[Dict[str, Any]]:
+    """Parse a recipe page's JSON-LD data (CPU-bound; safe to run in a worker process)."""
+    for match in _JSON_LD_RE.finditer(html):
+        try:
+            recipe = find_json_ld_recipe(orjson.loads(match.group(1)))
+        except orjson.JSONDecodeError:
+            continue
+        if recipe is not None:
+            return format_recipe_from_json_ld(recipe)
+    
+    # libxml2 parses at C speed, and only JSON-LD script tags are turned into a tree
+    soup = BeautifulSoup(html, 'lxml', parse_only=_JSON_LD_SCRIPTS)
+    
+    # Extract JSON-LD structured data
+    return extract_json_ld_recipe(soup)
+
+def parse_recipe_from_jsonld(url: str) -> Optional[Dict[str, Any]]:
+    """Parse regular recipe from URL using web scraping."""
+    try:
+        html = fetch_recipe_html(url)
+        if html is None:
+            return None
+        
+        return parse_recipe_html(html)
         
     except Exception as e:
         logger.error(f"Error extracting recipe content from {url}: {e}")
@@ -588,14 +718,33 @@ async def extract_recipe_data(url: str) -> Optional[Dict[str, Any]]:
         if is_tiktok_url(url):
             return await parse_tiktok_recipe(url)
         elif is_pinterest_url(url):
-            return parse_pinterest_recipe(url)
+            return await asyncio.to_thread(parse_pinterest_recipe, url)
         else:
-            return parse_recipe_from_jsonld(url)
+            # Fetch on the event loop, then parse in a worker process so many pages parse in parallel
+            response = await get_async_http_client().get(url)
+            response.raise_for_status()
+            html = response.content
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_parse_pool(), parse_recipe_html, html)
         
     except Exception as e:
         logger.error(f"Error extracting recipe content from {url}: {e}")
         return None
 
+def find_json_ld_recipe(data: Any) -> Optional[Dict[str, Any]]:
+    """Return the Recipe object from one decoded JSON-LD block (object, array, or @graph), if any."""
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict) and item.get('@type') == 'Recipe':
+                return item
+    elif isinstance(data, dict) and data.get('@type') == 'Recipe':
+        return data
+    elif isinstance(data, dict) and data.get('@graph'):
+        for item in data.get('@graph', []):
+            if isinstance(item, dict) and item.get('@type') == 'Recipe':
+                return item
+    return None
+
 def extract_json_ld_recipe(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
     """Extract recipe information from JSON-LD structured data."""
     try:
@@ -603,20 +752,12 @@ def extract_json_ld_recipe(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
         
         for script in json_ld_scripts:
             try:
-                data = json.loads(script.string)
-                
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                            return format_recipe_from_json_ld(item)
-                elif isinstance(data, dict) and data.get('@type') == 'Recipe':
-                    return format_recipe_from_json_ld(data)
-                elif isinstance(data, dict) and data.get('@graph'):
-                    for item in data.get('@graph', []):
-                        if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                            return format_recipe_from_json_ld(item)
+                # Empty script tags have no .string; they fail as a decode error below
+                recipe = find_json_ld_recipe(orjson.loads(script.string or ""))
+                if recipe is not None:
+                    return format_recipe_from_json_ld(recipe)
                     
-            except (json.JSONDecodeError, AttributeError) as e:
+            except orjson.JSONDecodeError as e:
                 logger.warning(f"Error parsing JSON-LD script: {e}")
                 continue
         
@@ -675,15 +816,27 @@ def format_recipe_from_json_ld(recipe_data: dict) -> Dict[str, Any]:
 async def enrich_recipe_with_ai(recipe_data: Dict[str, Any]) -> Dict[str, Any]:
     """Enrich recipe data with AI-generated information using OpenAI."""
     try:
+        ingredients = recipe_data.get('ingredients') or []
+        instructions = recipe_data.get('instruction_details') or recipe_data.get('instructions') or []
+        
+        # Degenerate extractions are not worth an OpenAI call: nothing to cook, or a
+        # couple of ingredients with no cooking tools mentioned is almost never a recipe
+        if not ingredients or not instructions or (
+            len(ingredients) < 3
+            and not (recipe_data.get('tools') or extract_tools_from_instructions(instructions))
+        ):
+            logger.info(f"Skipping AI enrichment for non-recipe content: {recipe_data.get('title', 'Unknown')}")
+            return _fallback_enrichment(recipe_data)
+        
         logger.info(f"Enriching recipe with AI: {recipe_data.get('title', 'Unknown')}")
         
         # Prepare the recipe data for AI analysis
         # Prepare instructions text to avoid f-string backslash issue
-        instructions_text = '\n'.join(recipe_data.get('instructions', []))
+        instructions_text = '\n'.join(map(str, instructions))
         
         recipe_text = f"""
 Title: {recipe_data.get('title', 'Unknown')}
-Ingredients: {', '.join(recipe_data.get('ingredients', []))}
+Ingredients: {', '.join(map(str, ingredients))}
 Instructions: {instructions_text}
 URL: {recipe_data.get('link', 'No URL')}
 """
@@ -693,8 +846,7 @@ URL: {recipe_data.get('link', 'No URL')}
         
         # Call OpenAI API with JSON schema
         client = get_openai_client()
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",  # Cost-effective model
             messages=[
                 {"role": "system", "content": RECIPE_ENRICHMENT_SYSTEM_PROMPT},
@@ -766,63 +918,14 @@ def extract_domain(url: str) -> str:
     except Exception:
         return "unknown"
 
-def get_available_tools() -> List:
-    """Get all available tools for the agent."""
-    return [
-        search_recipes,
-        get_similar_recipes,
-        find_similar_recipes_from_url,
-        extract_and_store_recipe
-    ] 
-
-# Tool extraction utilities from scraper service
-COOKING_TOOLS = [
-    # Cooking appliances
-    "slow cooker", "instant pot", "rice cooker", "pressure cooker", "air fryer",
-    "food processor", "blender", "stand mixer", "hand mixer", "immersion blender",
-    "sous vide", "microwave", "oven", "toaster oven", "broiler", "deep fryer",
-
-    # Cookware
-    "skillet", "frying pan", "saucepan", "stockpot", "dutch oven",
-    "grill", "griddle", "wok", "sheet pan", "baking dish", "casserole dish",
-    "mortar and pestle", "roasting pan", "steamer basket", "colander",
-
-    # Baking-specific tools
-    "rolling pin", "pastry brush", "flour sifter", "bench scraper",
-    "cookie sheet", "muffin tin", "loaf pan", "cake pan", "springform pan",
-    "pie dish", "cooling rack", "dough hook", "piping bag", "measuring cups", "measuring spoons",
-
-    # Utensils & techniques
-    "knife", "chef's knife", "paring knife", "chopping", "peeler",
-    "whisk", "spatula", "ladle", "tongs", "mixing bowl", "grater", "zester",
-    "can opener", "thermometer", "meat thermometer", "kitchen scale"
+# Built once so every caller gets the same (identity-stable) list
+_AVAILABLE_TOOLS: List = [
+    search_recipes,
+    get_similar_recipes,
+    find_similar_recipes_from_url,
+    extract_and_store_recipe
 ]
 
-def extract_tools_from_instructions(instructions) -> List[str]:
-    """
-    Extract cooking tools from recipe instructions.
-    
-    Args:
-        instructions: Recipe instructions (list or string)
-        
-    Returns:
-        List of cooking tools found in the instructions
-    """
-    found_tools = set()
-    
-    if isinstance(instructions, list):
-        text_array = instructions
-    elif isinstance(instructions, str):
-        text_array = [instructions]
-    else:
-        return []
-    
-    for text in text_array:
-        if not text:
-            continue
-        lower_text = text.lower()
-        for tool in COOKING_TOOLS:
-            if tool in lower_text:
-                found_tools.add(tool)
-    
-    return list(found_tools) 
\ No newline at end of file
+def get_available_tools() -> List:
+    """Get all available tools for the agent."""
+    return _AVAILABLE_TOOLS
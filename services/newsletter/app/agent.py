@@ -129,7 +129,7 @@ def get_agent() -> AgentExecutor:
         _agent_executor = create_agent()
     return _agent_executor
 
-def process_query(query: str, chat_history: List[Dict[str, Any]] = None) -> str:
+async def process_query(query: str, chat_history: List[Dict[str, Any]] = None) -> str:
     """
     Process a user query through the AI agent.
     
@@ -151,8 +151,8 @@ def process_query(query: str, chat_history: List[Dict[str, Any]] = None) -> str:
             "chat_history": chat_history or []
         }
         
-        # Run the agent
-        result = agent.invoke(inputs)
+        # Run the agent; async tools are awaited and sync tools run in the executor
+        result = await agent.ainvoke(inputs)
         
         logger.info("Query processed successfully")
         return result["output"]
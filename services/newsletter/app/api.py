@@ -1,23 +1,43 @@
 """FastAPI application with chat endpoint."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from typing import List, Optional
 from datetime import datetime
+import asyncio
 import logging
+import orjson
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from bson import ObjectId
+from bson.errors import InvalidId
+from pydantic import TypeAdapter
 
 from app.models import ChatRequest, ChatResponse, HealthResponse, ChatListResponse, ChatInfo
 from app.agent import process_query
-from app.mongo import get_chat_service
+from app.mongo import ChatService, ChatNotFoundError, get_recipe_service, ping_database, close_database
+from app.tools import close_http_client
+from app.cache import get_semantic_cache, get_history_cache, close_redis_client
+from app.config import get_cors_max_age, LOG_LEVEL
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; records are queued and written by a listener thread so
+# handler I/O (and its lock) stays off the event loop
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+logging.basicConfig(level=LOG_LEVEL, handlers=[QueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
 app = FastAPI(
     title="AI Recipe Agent API",
     description="An AI agent that helps with recipe recommendations and cooking advice, building toward newsletter generation",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes the chat/message lists (and their datetimes) natively
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -27,8 +47,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers reuse preflights instead of sending OPTIONS before every request
+    max_age=get_cors_max_age(),
 )
 
+# Validates a whole page of chat documents in one pass through pydantic-core
+_CHAT_LIST_ADAPTER = TypeAdapter(List[ChatInfo])
+
+def parse_chat_id(chat_id: str) -> ObjectId:
+    """Parse a chat ID once at the API boundary, rejecting malformed IDs with a 400."""
+    try:
+        return ObjectId(chat_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid chat ID")
+
+@app.on_event("startup")
+async def startup():
+    """Warm the MongoDB connection pool and set up services before the first chat."""
+    await ping_database()
+    app.state.chat_service = ChatService()
+    await asyncio.gather(
+        app.state.chat_service.ensure_indexes(),
+        get_recipe_service().ensure_indexes()
+    )
+    get_tools_body()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled outbound HTTP, Redis, and MongoDB connections."""
+    await close_http_client()
+    await close_redis_client()
+    await close_database()
+    # Flush queued log records
+    _log_listener.stop()
+
 @app.get("/", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
@@ -50,37 +102,68 @@ async def chat(request: ChatRequest):
     If chat_id is null, a new chat session will be created.
     """
     try:
-        logger.info(f"Received chat request: {request.message[:100]}...")
+        logger.info("Received chat request: %.100s", request.message)
         
-        chat_service = get_chat_service()
+        chat_service = app.state.chat_service
         
         # Handle chat ID - create new chat if none provided
         if request.chat_id is None or request.chat_id == '':
             # Create a new chat with prompt if provided
-            chat_id = await chat_service.create_chat(prompt=request.prompt)
-            logger.info(f"Created new chat with ID: {chat_id}")
+            chat_object_id = await chat_service.create_chat(prompt=request.prompt)
+            chat_id = str(chat_object_id)
+            message_count = 0
+            logger.info("Created new chat with ID: %s", chat_id)
         else:
-            # Verify existing chat exists
-            chat = await chat_service.get_chat(request.chat_id)
-            if not chat:
+            chat_object_id = parse_chat_id(request.chat_id)
+            # Verify the chat exists (before running the agent) and get its history version
+            message_count = await chat_service.get_chat_message_count(chat_object_id)
+            if message_count is None:
                 raise HTTPException(status_code=404, detail="Chat not found")
             chat_id = request.chat_id
-            logger.info(f"Using existing chat: {chat_id}")
-        
-        # Get chat history for the agent
-        chat_history = await chat_service.get_chat_history_for_agent(chat_id)
-        
-        # Process the query through the AI agent
-        response = process_query(
-            query=request.message,
-            chat_history=chat_history
-        )
-        
-        # Save the user message
-        await chat_service.add_message(chat_id, "user", request.message)
-        
-        # Save the assistant response
-        await chat_service.add_message(chat_id, "assistant", response)
+            logger.info("Using existing chat: %s", chat_id)
+        
+        # Get chat history for the agent, from the cache when it is current
+        history_cache = get_history_cache()
+        chat_history = None
+        if message_count == 0:
+            # A chat that was just created (or never used) has no history to read
+            chat_history = []
+        elif history_cache:
+            chat_history = await history_cache.get(chat_id, message_count)
+        if chat_history is None:
+            chat_history = await chat_service.get_chat_history_for_agent(chat_object_id)
+        
+        # Opening messages don't depend on earlier turns, so a semantically
+        # equivalent past prompt can answer them without running the agent
+        semantic_cache = get_semantic_cache()
+        query_vector = None
+        response = None
+        if semantic_cache and not chat_history:
+            query_vector = await semantic_cache.embed(request.message)
+            if query_vector is not None:
+                response = await semantic_cache.lookup(query_vector)
+        
+        if response is None:
+            # Process the query through the AI agent
+            response = await process_query(
+                query=request.message,
+                chat_history=chat_history
+            )
+            if query_vector is not None:
+                await semantic_cache.store(request.message, query_vector, response)
+        
+        # Save the user message and the assistant response together
+        new_messages = [("user", request.message), ("assistant", response)]
+        _, new_message_count = await chat_service.add_messages(chat_object_id, new_messages)
+        
+        # Cache the updated history so the next turn skips the Mongo read, unless another
+        # request added messages to this chat meanwhile (the history would be missing them)
+        if history_cache and new_message_count == message_count + len(new_messages):
+            await history_cache.set(
+                chat_id,
+                message_count + len(new_messages),
+                chat_history + [{"role": role, "content": content} for role, content in new_messages]
+            )
         
         logger.info("Chat request processed successfully")
         
@@ -93,6 +176,9 @@ async def chat(request: ChatRequest):
         
     except HTTPException:
         raise
+    except ChatNotFoundError:
+        # The chat was deleted while the agent was running
+        raise HTTPException(status_code=404, detail="Chat not found")
     except Exception as e:
         logger.error(f"Error processing chat request: {e}")
         raise HTTPException(
@@ -101,34 +187,40 @@ async def chat(request: ChatRequest):
         )
 
 @app.get("/chats", response_model=ChatListResponse)
-async def get_chats():
+async def get_chats(
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[datetime] = None
+):
     """
-    Get all chat sessions.
+    Get chat sessions, most recently updated first, one page at a time.
     
-    Returns a list of all chat sessions with their metadata.
+    Args:
+        limit: Maximum number of chats to return
+        before: Only return chats updated before this time (the previous page's next_cursor)
+        
+    Returns:
+        A page of chat sessions with their metadata, and the cursor for the next page
     """
     try:
-        logger.info("Retrieving all chats")
+        logger.info("Retrieving chats")
         
-        chat_service = get_chat_service()
-        chats = await chat_service.get_all_chats()
+        chat_service = app.state.chat_service
+        chats = await chat_service.get_all_chats(limit=limit, before=before)
         
         # Convert to response format
-        chat_list = []
-        for chat in chats:
-            chat_list.append(ChatInfo(
-                id=chat["_id"],
-                title=chat["title"],
-                prompt=chat.get("prompt"),
-                newsletter=chat.get("newsletter"),
-                created_at=chat["created_at"],
-                updated_at=chat["updated_at"],
-                message_count=chat["message_count"]
-            ))
+        chat_list = _CHAT_LIST_ADAPTER.validate_python(chats)
         
         logger.info(f"Retrieved {len(chat_list)} chats")
         
-        return ChatListResponse(chats=chat_list)
+        # A full page means there may be more; the next page starts before its last chat
+        next_cursor = chat_list[-1].updated_at if len(chat_list) == limit else None
+        
+        # pydantic-core writes the JSON directly; returning a Response skips FastAPI
+        # re-validating the model and re-encoding it through a dict
+        return Response(
+            content=ChatListResponse(chats=chat_list, next_cursor=next_cursor).model_dump_json(),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Error retrieving chats: {e}")
@@ -150,17 +242,18 @@ async def get_chat(chat_id: str):
     """
     try:
         logger.info(f"Retrieving chat: {chat_id}")
+        chat_object_id = parse_chat_id(chat_id)
         
-        chat_service = get_chat_service()
+        chat_service = app.state.chat_service
         
-        # Get chat info
-        chat = await chat_service.get_chat(chat_id)
+        # Get chat info and messages concurrently (messages of a missing chat are just empty)
+        chat, messages = await asyncio.gather(
+            chat_service.get_chat(chat_object_id),
+            chat_service.get_chat_messages(chat_object_id)
+        )
         if not chat:
             raise HTTPException(status_code=404, detail="Chat not found")
         
-        # Get chat messages
-        messages = await chat_service.get_chat_messages(chat_id)
-        
         return {
             "id": chat["_id"],
             "title": chat["title"],
@@ -194,9 +287,10 @@ async def delete_chat(chat_id: str):
     """
     try:
         logger.info(f"Deleting chat: {chat_id}")
+        chat_object_id = parse_chat_id(chat_id)
         
-        chat_service = get_chat_service()
-        success = await chat_service.delete_chat(chat_id)
+        chat_service = app.state.chat_service
+        success = await chat_service.delete_chat(chat_object_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Chat not found")
@@ -226,13 +320,14 @@ async def update_chat_prompt(chat_id: str, request: dict):
     """
     try:
         logger.info(f"Updating prompt for chat: {chat_id}")
+        chat_object_id = parse_chat_id(chat_id)
         
         prompt = request.get("prompt")
         if not prompt:
             raise HTTPException(status_code=400, detail="Prompt is required")
         
-        chat_service = get_chat_service()
-        success = await chat_service.update_chat_prompt(chat_id, prompt)
+        chat_service = app.state.chat_service
+        success = await chat_service.update_chat_prompt(chat_object_id, prompt)
         
         if not success:
             raise HTTPException(status_code=404, detail="Chat not found")
@@ -262,13 +357,14 @@ async def update_chat_newsletter(chat_id: str, request: dict):
     """
     try:
         logger.info(f"Updating newsletter for chat: {chat_id}")
+        chat_object_id = parse_chat_id(chat_id)
         
         newsletter = request.get("newsletter")
         if not newsletter:
             raise HTTPException(status_code=400, detail="Newsletter content is required")
         
-        chat_service = get_chat_service()
-        success = await chat_service.update_chat_newsletter(chat_id, newsletter)
+        chat_service = app.state.chat_service
+        success = await chat_service.update_chat_newsletter(chat_object_id, newsletter)
         
         if not success:
             raise HTTPException(status_code=404, detail="Chat not found")
@@ -284,19 +380,27 @@ async def update_chat_newsletter(chat_id: str, request: dict):
             detail=f"Internal server error: {str(e)}"
         )
 
+# Serialized /tools body; the tool set is fixed for the life of the process
+_tools_body: Optional[bytes] = None
+
+def get_tools_body() -> bytes:
+    """Get the serialized tool list, building it on first use."""
+    global _tools_body
+    if _tools_body is None:
+        from app.tools import get_available_tools
+        
+        tool_info = []
+        for tool in get_available_tools():
+            tool_info.append({
+                "name": tool.name,
+                "description": tool.description,
+                "args_schema": str(tool.args_schema) if hasattr(tool, 'args_schema') else None
+            })
+        
+        _tools_body = orjson.dumps({"tools": tool_info})
+    return _tools_body
+
 @app.get("/tools")
 async def list_tools():
     """List available tools for the AI agent."""
-    from app.tools import get_available_tools
-    
-    tools = get_available_tools()
-    tool_info = []
-    
-    for tool in tools:
-        tool_info.append({
-            "name": tool.name,
-            "description": tool.description,
-            "args_schema": str(tool.args_schema) if hasattr(tool, 'args_schema') else None
-        })
-    
-    return {"tools": tool_info} 
\ No newline at end of file
+    return Response(content=get_tools_body(), media_type="application/json")
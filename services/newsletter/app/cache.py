@@ -0,0 +1,219 @@
+"""Redis-backed caches for chat responses and chat history."""
+
+from typing import List, Dict, Any, Optional
+from array import array
+import hashlib
+import logging
+import orjson
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+from redis.commands.search.field import TextField, VectorField
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+
+from app.tools import get_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Global Redis client shared by the caches (None until first use)
+_redis_client: Optional[aioredis.Redis] = None
+
+def get_redis_client() -> Optional[aioredis.Redis]:
+    """Get or create the global Redis client, or None if REDIS_URL is not set."""
+    global _redis_client
+    if _redis_client is None:
+        from app.config import get_redis_url
+        url = get_redis_url()
+        if not url:
+            return None
+        # Embeddings are stored as raw float32 bytes, so values are decoded by hand
+        _redis_client = aioredis.from_url(url)
+    return _redis_client
+
+class SemanticCache:
+    """Caches agent responses keyed by the embedding of the prompt that produced them."""
+
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        max_distance: float = 0.05,
+        ttl: int = 3600,
+        index_name: str = "chat_cache",
+        prefix: str = "chat:cache:"
+    ):
+        """Initialize the cache; the vector index is created on first use."""
+        self.client = client
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.index_name = index_name
+        self.prefix = prefix
+        self._index_ready = False
+
+    async def _ensure_index(self) -> None:
+        """Ensure the HNSW vector index over cached prompts exists."""
+        if self._index_ready:
+            return
+        try:
+            await self.client.ft(self.index_name).create_index(
+                [
+                    TextField("prompt"),
+                    VectorField("embedding", "HNSW", {
+                        "TYPE": "FLOAT32",
+                        "DIM": 1536,
+                        "DISTANCE_METRIC": "COSINE"
+                    })
+                ],
+                definition=IndexDefinition(prefix=[self.prefix], index_type=IndexType.HASH)
+            )
+            logger.info(f"Created semantic cache index: {self.index_name}")
+        except ResponseError as e:
+            if "already exists" not in str(e):
+                raise
+        self._index_ready = True
+
+    async def embed(self, prompt: str) -> Optional[List[float]]:
+        """Embed a prompt for lookup and storage, or None if embedding fails."""
+        try:
+            return await get_embeddings().aembed_query(prompt)
+        except Exception as e:
+            logger.warning(f"Error embedding prompt for semantic cache: {e}")
+            return None
+
+    async def lookup(self, vector: List[float]) -> Optional[str]:
+        """
+        Get the cached response for the most similar past prompt.
+
+        Args:
+            vector: Embedding of the incoming prompt
+
+        Returns:
+            The cached response, or None if no past prompt is close enough
+        """
+        try:
+            await self._ensure_index()
+            query = (
+                Query("*=>[KNN 1 @embedding $vec AS distance]")
+                .return_fields("response", "distance")
+                .dialect(2)
+            )
+            result = await self.client.ft(self.index_name).search(
+                query, query_params={"vec": array("f", vector).tobytes()}
+            )
+            if result.docs and float(result.docs[0].distance) <= self.max_distance:
+                logger.info(f"Semantic cache hit (distance {float(result.docs[0].distance):.3f})")
+                response = result.docs[0].response
+                return response.decode() if isinstance(response, bytes) else response
+            return None
+
+        except Exception as e:
+            logger.warning(f"Error looking up semantic cache: {e}")
+            return None
+
+    async def store(self, prompt: str, vector: List[float], response: str) -> None:
+        """
+        Cache a response under its prompt's embedding.
+
+        Args:
+            prompt: The prompt that produced the response
+            vector: Embedding of the prompt
+            response: The agent response
+        """
+        try:
+            await self._ensure_index()
+            key = self.prefix + hashlib.sha256(prompt.encode()).hexdigest()
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(key, mapping={
+                "prompt": prompt,
+                "response": response,
+                "embedding": array("f", vector).tobytes()
+            })
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+        except Exception as e:
+            logger.warning(f"Error storing response in semantic cache: {e}")
+
+class ChatHistoryCache:
+    """Caches a chat's agent-format history, versioned by the chat's message count."""
+
+    def __init__(self, client: aioredis.Redis, ttl: int = 300, prefix: str = "chat:hist:"):
+        """Initialize the cache."""
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, chat_id: str, message_count: int) -> str:
+        # Any new message bumps the count, so stale histories are simply never read again
+        return f"{self.prefix}{chat_id}:{message_count}"
+
+    async def get(self, chat_id: str, message_count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached history of a chat.
+
+        Args:
+            chat_id: The chat ID
+            message_count: The chat's current message count
+
+        Returns:
+            The history in agent format, or None on a miss
+        """
+        try:
+            cached = await self.client.get(self._key(chat_id, message_count))
+            return orjson.loads(cached) if cached is not None else None
+
+        except Exception as e:
+            logger.warning(f"Error reading cached history for chat {chat_id}: {e}")
+            return None
+
+    async def set(self, chat_id: str, message_count: int, history: List[Dict[str, Any]]) -> None:
+        """
+        Cache the history of a chat.
+
+        Args:
+            chat_id: The chat ID
+            message_count: The message count the history corresponds to
+            history: The history in agent format
+        """
+        try:
+            await self.client.set(self._key(chat_id, message_count), orjson.dumps(history), ex=self.ttl)
+
+        except Exception as e:
+            logger.warning(f"Error caching history for chat {chat_id}: {e}")
+
+# Global cache instances (None when Redis is not configured)
+_semantic_cache: Optional[SemanticCache] = None
+_history_cache: Optional[ChatHistoryCache] = None
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Get or create the global semantic cache, or None if REDIS_URL is not set."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        from app.config import get_semantic_cache_max_distance, get_semantic_cache_ttl
+        client = get_redis_client()
+        if client is None:
+            return None
+        _semantic_cache = SemanticCache(
+            client=client,
+            max_distance=get_semantic_cache_max_distance(),
+            ttl=get_semantic_cache_ttl()
+        )
+    return _semantic_cache
+
+def get_history_cache() -> Optional[ChatHistoryCache]:
+    """Get or create the global chat history cache, or None if REDIS_URL is not set."""
+    global _history_cache
+    if _history_cache is None:
+        client = get_redis_client()
+        if client is None:
+            return None
+        _history_cache = ChatHistoryCache(client=client)
+    return _history_cache
+
+async def close_redis_client():
+    """Close the global Redis client and the caches using it."""
+    global _redis_client, _semantic_cache, _history_cache
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+        _semantic_cache = None
+        _history_cache = None
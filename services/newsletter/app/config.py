@@ -1,12 +1,16 @@
 """Configuration settings for the AI agent application."""
 
 import os
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Getters read the environment once; a getter that raises is retried on the next call
+
+@lru_cache(maxsize=1)
 def get_openai_api_key() -> str:
     """Get OpenAI API key from environment."""
     key = os.getenv("OPENAI_API_KEY")
@@ -14,10 +18,12 @@ def get_openai_api_key() -> str:
         raise ValueError("OPENAI_API_KEY environment variable is required")
     return key
 
+@lru_cache(maxsize=1)
 def get_vector_db_api_key() -> Optional[str]:
     """Get Qdrant API key from environment."""
     return os.getenv("VECTOR_DB_API_KEY")
 
+@lru_cache(maxsize=1)
 def get_vector_db_url() -> str:
     """Get Qdrant URL from environment."""
     url = os.getenv("VECTOR_DB_URL")
@@ -25,14 +31,22 @@ def get_vector_db_url() -> str:
         raise ValueError("VECTOR_DB_URL environment variable is required")
     return url
 
+@lru_cache(maxsize=1)
+def get_vector_db_prefer_grpc() -> bool:
+    """Whether to talk to Qdrant over gRPC (vectors travel as packed float32 instead of JSON text)."""
+    return os.getenv("VECTOR_DB_PREFER_GRPC", "true").lower() == "true"
+
+@lru_cache(maxsize=1)
 def get_tavily_api_key() -> Optional[str]:
     """Get Tavily API key from environment."""
     return os.getenv("TAVILY_API_KEY")
 
+@lru_cache(maxsize=1)
 def get_serpapi_key() -> Optional[str]:
     """Get SerpAPI key from environment."""
     return os.getenv("SERPAPI_API_KEY")
 
+@lru_cache(maxsize=1)
 def get_mongodb_uri() -> str:
     """Get MongoDB connection URI from environment."""
     uri = os.getenv("MONGODB_URI")
@@ -40,11 +54,43 @@ def get_mongodb_uri() -> str:
         raise ValueError("MONGODB_URI environment variable is required")
     return uri
 
+@lru_cache(maxsize=1)
 def get_mongodb_database() -> str:
     """Get MongoDB database name from environment."""
     return os.getenv("MONGODB_DATABASE", "newsletter_agent")
 
+@lru_cache(maxsize=1)
+def get_redis_url() -> Optional[str]:
+    """Get Redis URL from environment (the chat semantic cache is disabled when unset)."""
+    return os.getenv("REDIS_URL")
+
+@lru_cache(maxsize=1)
+def get_semantic_cache_max_distance() -> float:
+    """Get the largest cosine distance at which a cached chat response is reused."""
+    return float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.05"))
+
+@lru_cache(maxsize=1)
+def get_semantic_cache_ttl() -> int:
+    """Get how long cached chat responses live, in seconds."""
+    return int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+
+@lru_cache(maxsize=1)
+def get_cors_max_age() -> int:
+    """Get how long browsers may cache CORS preflight responses, in seconds."""
+    return int(os.getenv("CORS_MAX_AGE", "3600"))
+
+@lru_cache(maxsize=1)
+def get_mongodb_max_pool_size() -> int:
+    """Get the maximum number of pooled MongoDB connections."""
+    return int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+
+@lru_cache(maxsize=1)
+def get_mongodb_min_pool_size() -> int:
+    """Get the number of MongoDB connections kept open while idle."""
+    return int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+
 # Application settings
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO").upper()
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000")) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 """Pydantic models for API requests and responses."""
 
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 class ChatRequest(BaseModel):
@@ -39,7 +39,10 @@ class ChatResponse(BaseModel):
 
 class ChatInfo(BaseModel):
     """Model for chat information."""
-    id: str = Field(..., description="Chat unique identifier")
+    # Validates straight from chat documents (`_id`) while still serializing as `id`
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(..., validation_alias="_id", description="Chat unique identifier")
     title: str = Field(..., description="Chat title")
     prompt: Optional[str] = Field(
         default=None, 
@@ -55,7 +58,11 @@ class ChatInfo(BaseModel):
 
 class ChatListResponse(BaseModel):
     """Response model for chat list endpoint."""
-    chats: List[ChatInfo] = Field(..., description="List of all chats")
+    chats: List[ChatInfo] = Field(..., description="Page of chats, most recently updated first")
+    next_cursor: Optional[datetime] = Field(
+        default=None,
+        description="Pass as `before` to get the next page; null on the last page"
+    )
 
 class HealthResponse(BaseModel):
     """Response model for health check endpoint."""
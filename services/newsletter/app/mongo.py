@@ -1,44 +1,72 @@
 """MongoDB database operations for chat persistence."""
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 
-from app.config import get_mongodb_uri, get_mongodb_database
+from app.config import (
+    get_mongodb_uri, get_mongodb_database, get_mongodb_max_pool_size, get_mongodb_min_pool_size
+)
 
 logger = logging.getLogger(__name__)
 
 # Global database client and database instances
-_client: AsyncIOMotorClient = None
-_database: AsyncIOMotorDatabase = None
+_client: AsyncMongoClient = None
+_database: AsyncDatabase = None
 
-def get_database() -> AsyncIOMotorDatabase:
+def get_client() -> AsyncMongoClient:
+    """Get the MongoDB client shared by all databases (one connection pool)."""
+    global _client
+    if _client is None:
+        # Native asyncio driver: socket I/O runs on the event loop, not a thread pool
+        _client = AsyncMongoClient(
+            get_mongodb_uri(),
+            maxPoolSize=get_mongodb_max_pool_size(),
+            # Keep warm connections so a burst of chats doesn't open new ones
+            minPoolSize=get_mongodb_min_pool_size(),
+            maxIdleTimeMS=300_000,
+            # Limit concurrent handshakes so a burst doesn't cause a connection storm
+            maxConnecting=4
+        )
+        logger.info("MongoDB client initialized")
+    return _client
+
+def get_database() -> AsyncDatabase:
     """Get the MongoDB database instance."""
     global _database
     if _database is None:
-        global _client
-        if _client is None:
-            uri = get_mongodb_uri()
-            _client = AsyncIOMotorClient(uri)
-            logger.info("MongoDB client initialized")
-        
         database_name = get_mongodb_database()
-        _database = _client[database_name]
+        _database = get_client()[database_name]
         logger.info(f"Using MongoDB database: {database_name}")
     
     return _database
 
+async def ping_database():
+    """Open the connection pool ahead of the first request."""
+    try:
+        await get_client().admin.command("ping")
+        logger.info("MongoDB connection established")
+    except Exception as e:
+        logger.warning(f"Error pinging MongoDB: {e}")
+
 async def close_database():
     """Close the MongoDB connection."""
-    global _client, _database
+    global _client, _database, _recipe_service
     if _client:
-        _client.close()
+        await _client.close()
         _client = None
         _database = None
+        # The recipe service holds collections from the closed client
+        _recipe_service = None
         logger.info("MongoDB connection closed")
 
+class ChatNotFoundError(Exception):
+    """Raised when a chat ID does not match any stored chat."""
+
 class ChatService:
     """Service for managing chat operations in MongoDB."""
     
@@ -46,8 +74,24 @@ class ChatService:
         self.db = get_database()
         self.chats_collection = self.db.chats
         self.messages_collection = self.db.messages
+        self._indexes_ready = False
     
-    async def create_chat(self, title: str = None, prompt: str = None) -> str:
+    async def ensure_indexes(self):
+        """Create the indexes behind the message history and chat list sorts (once)."""
+        if self._indexes_ready:
+            return
+        try:
+            await asyncio.gather(
+                # Covers find-by-chat sorted by created_at, _id without an in-memory sort
+                self.messages_collection.create_index([("chat_id", 1), ("created_at", 1), ("_id", 1)]),
+                self.chats_collection.create_index([("updated_at", -1)])
+            )
+            self._indexes_ready = True
+            logger.info("MongoDB chat indexes ensured")
+        except Exception as e:
+            logger.warning(f"Error ensuring chat indexes: {e}")
+    
+    async def create_chat(self, title: str = None, prompt: str = None) -> ObjectId:
         """
         Create a new chat session.
         
@@ -56,19 +100,20 @@ class ChatService:
             prompt: Optional newsletter generation prompt
             
         Returns:
-            The chat ID as a string
+            The chat ID
         """
         try:
+            now = datetime.now(timezone.utc)
             chat_doc = {
-                "title": title or f"Chat {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
+                "title": title or f"Chat {now.strftime('%Y-%m-%d %H:%M')}",
                 "prompt": prompt,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
+                "created_at": now,
+                "updated_at": now,
                 "message_count": 0
             }
             
             result = await self.chats_collection.insert_one(chat_doc)
-            chat_id = str(result.inserted_id)
+            chat_id = result.inserted_id
             
             logger.info(f"Created new chat with ID: {chat_id}")
             return chat_id
@@ -77,7 +122,7 @@ class ChatService:
             logger.error(f"Error creating chat: {e}")
             raise
     
-    async def get_chat(self, chat_id: str) -> Optional[Dict[str, Any]]:
+    async def get_chat(self, chat_id: ObjectId) -> Optional[Dict[str, Any]]:
         """
         Get a chat by ID.
         
@@ -88,7 +133,7 @@ class ChatService:
             Chat document or None if not found
         """
         try:
-            chat = await self.chats_collection.find_one({"_id": ObjectId(chat_id)})
+            chat = await self.chats_collection.find_one({"_id": chat_id})
             if chat:
                 chat["_id"] = str(chat["_id"])
             return chat
@@ -97,15 +142,40 @@ class ChatService:
             logger.error(f"Error getting chat {chat_id}: {e}")
             return None
     
-    async def get_all_chats(self) -> List[Dict[str, Any]]:
+    async def get_chat_message_count(self, chat_id: ObjectId) -> Optional[int]:
         """
-        Get all chats.
+        Get a chat's message count without fetching the rest of the document.
         
+        Args:
+            chat_id: The chat ID
+            
+        Returns:
+            The message count, or None if the chat doesn't exist
+        """
+        try:
+            chat = await self.chats_collection.find_one(
+                {"_id": chat_id}, {"_id": 0, "message_count": 1}
+            )
+            return chat.get("message_count", 0) if chat else None
+            
+        except Exception as e:
+            logger.error(f"Error getting message count for chat {chat_id}: {e}")
+            return None
+    
+    async def get_all_chats(self, limit: int = 50, before: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Get a page of chats, most recently updated first.
+        
+        Args:
+            limit: Maximum number of chats to return
+            before: Only return chats updated before this time
+            
         Returns:
             List of chat documents
         """
         try:
-            cursor = self.chats_collection.find().sort("updated_at", -1)
+            query = {"updated_at": {"$lt": before}} if before else {}
+            cursor = self.chats_collection.find(query).sort("updated_at", -1).limit(limit)
             chats = []
             async for chat in cursor:
                 chat["_id"] = str(chat["_id"])
@@ -118,7 +188,7 @@ class ChatService:
             logger.error(f"Error getting all chats: {e}")
             return []
     
-    async def add_message(self, chat_id: str, role: str, content: str) -> str:
+    async def add_message(self, chat_id: ObjectId, role: str, content: str) -> str:
         """
         Add a message to a chat.
         
@@ -129,35 +199,62 @@ class ChatService:
             
         Returns:
             The message ID as a string
+            
+        Raises:
+            ChatNotFoundError: If the chat doesn't exist
         """
-        try:
-            message_doc = {
-                "chat_id": ObjectId(chat_id),
-                "role": role,
-                "content": content,
-                "created_at": datetime.utcnow()
-            }
+        # Same counter update + insert as a batch of one
+        message_ids, _ = await self.add_messages(chat_id, [(role, content)])
+        return message_ids[0]
+    
+    async def add_messages(self, chat_id: ObjectId, messages: List[Tuple[str, str]]) -> Tuple[List[str], int]:
+        """
+        Add several messages to a chat in one round trip per collection.
+        
+        Args:
+            chat_id: The chat ID
+            messages: (role, content) pairs in conversation order
             
-            result = await self.messages_collection.insert_one(message_doc)
-            message_id = str(result.inserted_id)
+        Returns:
+            The message IDs as strings, and the chat's message count after the update
             
-            # Update chat's message count and updated_at
-            await self.chats_collection.update_one(
-                {"_id": ObjectId(chat_id)},
+        Raises:
+            ChatNotFoundError: If the chat doesn't exist
+        """
+        try:
+            now = datetime.now(timezone.utc)
+            message_docs = [
                 {
-                    "$inc": {"message_count": 1},
-                    "$set": {"updated_at": datetime.utcnow()}
+                    "chat_id": chat_id,
+                    "role": role,
+                    "content": content,
+                    "created_at": now
                 }
+                for role, content in messages
+            ]
+            
+            # Bump the counter first so messages are never inserted for a chat that was deleted
+            chat = await self.chats_collection.find_one_and_update(
+                {"_id": chat_id},
+                {
+                    "$inc": {"message_count": len(message_docs)},
+                    "$set": {"updated_at": now}
+                },
+                projection={"message_count": 1},
+                return_document=ReturnDocument.AFTER
             )
+            if chat is None:
+                raise ChatNotFoundError(chat_id)
+            result = await self.messages_collection.insert_many(message_docs)
             
-            logger.info(f"Added message to chat {chat_id}: {role}")
-            return message_id
+            logger.info(f"Added {len(message_docs)} messages to chat {chat_id}")
+            return [str(message_id) for message_id in result.inserted_ids], chat["message_count"]
             
         except Exception as e:
-            logger.error(f"Error adding message to chat {chat_id}: {e}")
+            logger.error(f"Error adding messages to chat {chat_id}: {e}")
             raise
     
-    async def get_chat_messages(self, chat_id: str) -> List[Dict[str, Any]]:
+    async def get_chat_messages(self, chat_id: ObjectId) -> List[Dict[str, Any]]:
         """
         Get all messages for a chat.
         
@@ -168,7 +265,10 @@ class ChatService:
             List of message documents
         """
         try:
-            cursor = self.messages_collection.find({"chat_id": ObjectId(chat_id)}).sort("created_at", 1)
+            # Messages saved together share created_at; _id keeps them in insertion order
+            cursor = self.messages_collection.find({"chat_id": chat_id}).sort(
+                [("created_at", 1), ("_id", 1)]
+            )
             messages = []
             async for message in cursor:
                 message["_id"] = str(message["_id"])
@@ -182,7 +282,7 @@ class ChatService:
             logger.error(f"Error getting messages for chat {chat_id}: {e}")
             return []
     
-    async def get_chat_history_for_agent(self, chat_id: str) -> List[Dict[str, Any]]:
+    async def get_chat_history_for_agent(self, chat_id: ObjectId) -> List[Dict[str, Any]]:
         """
         Get chat history in the format expected by the agent.
         
@@ -193,22 +293,18 @@ class ChatService:
             List of messages in agent format
         """
         try:
-            messages = await self.get_chat_messages(chat_id)
-            agent_history = []
-            
-            for message in messages:
-                agent_history.append({
-                    "role": message["role"],
-                    "content": message["content"]
-                })
-            
-            return agent_history
+            # Project just the agent fields; documents then already have the agent shape
+            cursor = self.messages_collection.find(
+                {"chat_id": chat_id},
+                {"_id": 0, "role": 1, "content": 1}
+            ).sort([("created_at", 1), ("_id", 1)])
+            return [message async for message in cursor]
             
         except Exception as e:
             logger.error(f"Error getting chat history for agent: {e}")
             return []
     
-    async def update_chat_title(self, chat_id: str, title: str) -> bool:
+    async def update_chat_title(self, chat_id: ObjectId, title: str) -> bool:
         """
         Update the title of a chat.
         
@@ -221,8 +317,8 @@ class ChatService:
         """
         try:
             result = await self.chats_collection.update_one(
-                {"_id": ObjectId(chat_id)},
-                {"$set": {"title": title, "updated_at": datetime.utcnow()}}
+                {"_id": chat_id},
+                {"$set": {"title": title, "updated_at": datetime.now(timezone.utc)}}
             )
             
             success = result.modified_count > 0
@@ -237,7 +333,7 @@ class ChatService:
             logger.error(f"Error updating chat title for {chat_id}: {e}")
             return False
     
-    async def update_chat_prompt(self, chat_id: str, prompt: str) -> bool:
+    async def update_chat_prompt(self, chat_id: ObjectId, prompt: str) -> bool:
         """
         Update the newsletter generation prompt of a chat.
         
@@ -250,8 +346,8 @@ class ChatService:
         """
         try:
             result = await self.chats_collection.update_one(
-                {"_id": ObjectId(chat_id)},
-                {"$set": {"prompt": prompt, "updated_at": datetime.utcnow()}}
+                {"_id": chat_id},
+                {"$set": {"prompt": prompt, "updated_at": datetime.now(timezone.utc)}}
             )
             
             success = result.modified_count > 0
@@ -266,7 +362,7 @@ class ChatService:
             logger.error(f"Error updating chat prompt for {chat_id}: {e}")
             return False
 
-    async def update_chat_newsletter(self, chat_id: str, newsletter: str) -> bool:
+    async def update_chat_newsletter(self, chat_id: ObjectId, newsletter: str) -> bool:
         """
         Update the newsletter content of a chat.
         
@@ -279,8 +375,8 @@ class ChatService:
         """
         try:
             result = await self.chats_collection.update_one(
-                {"_id": ObjectId(chat_id)},
-                {"$set": {"newsletter": newsletter, "updated_at": datetime.utcnow()}}
+                {"_id": chat_id},
+                {"$set": {"newsletter": newsletter, "updated_at": datetime.now(timezone.utc)}}
             )
             
             success = result.modified_count > 0
@@ -295,7 +391,7 @@ class ChatService:
             logger.error(f"Error updating chat newsletter for {chat_id}: {e}")
             return False
     
-    async def delete_chat(self, chat_id: str) -> bool:
+    async def delete_chat(self, chat_id: ObjectId) -> bool:
         """
         Delete a chat and all its messages.
         
@@ -307,10 +403,10 @@ class ChatService:
         """
         try:
             # Delete all messages for this chat
-            await self.messages_collection.delete_many({"chat_id": ObjectId(chat_id)})
+            await self.messages_collection.delete_many({"chat_id": chat_id})
             
             # Delete the chat
-            result = await self.chats_collection.delete_one({"_id": ObjectId(chat_id)})
+            result = await self.chats_collection.delete_one({"_id": chat_id})
             
             success = result.deleted_count > 0
             if success:
@@ -328,10 +424,23 @@ class RecipeService:
     """Service for managing recipe operations in MongoDB."""
     
     def __init__(self):
-        # Use a different database for recipes
-        self.client = AsyncIOMotorClient(get_mongodb_uri())
+        # Use a different database for recipes (on the shared connection pool)
+        self.client = get_client()
         self.db = self.client.recipes  # Use 'recipes' database instead of newsletter-generation
         self.recipes_collection = self.db.parsed_recipes  # Use 'parsed_recipes' collection
+        self._indexes_ready = False
+    
+    async def ensure_indexes(self):
+        """Create the index behind recipe lookups by URL (once)."""
+        if self._indexes_ready:
+            return
+        try:
+            # Same unique link index the MCP service creates on this collection
+            await self.recipes_collection.create_index("link", unique=True)
+            self._indexes_ready = True
+            logger.info("MongoDB recipe indexes ensured")
+        except Exception as e:
+            logger.warning(f"Error ensuring recipe indexes: {e}")
     
     async def add_recipe(self, recipe_data: Dict[str, Any]) -> str:
         """
@@ -345,10 +454,11 @@ class RecipeService:
         """
         try:
             # Add timestamps
+            now = datetime.now(timezone.utc)
             recipe_doc = {
                 **recipe_data,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
             
             result = await self.recipes_collection.insert_one(recipe_doc)
@@ -413,7 +523,7 @@ class RecipeService:
             True if successful, False otherwise
         """
         try:
-            recipe_data["updated_at"] = datetime.utcnow()
+            recipe_data["updated_at"] = datetime.now(timezone.utc)
             
             result = await self.recipes_collection.update_one(
                 {"_id": ObjectId(recipe_id)},
@@ -457,17 +567,9 @@ class RecipeService:
             logger.error(f"Error deleting recipe {recipe_id}: {e}")
             return False
 
-# Global service instances
-_chat_service: ChatService = None
+# Global service instance (the chat service lives on the FastAPI app state)
 _recipe_service: RecipeService = None
 
-def get_chat_service() -> ChatService:
-    """Get the global chat service instance."""
-    global _chat_service
-    if _chat_service is None:
-        _chat_service = ChatService()
-    return _chat_service
-
 def get_recipe_service() -> RecipeService:
     """Get the global recipe service instance."""
     global _recipe_service
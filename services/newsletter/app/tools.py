@@ -1,11 +1,12 @@
 """Custom tools for the AI agent."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain.tools import tool
 from langchain_openai import OpenAIEmbeddings
+import asyncio
+import httpx
 import logging
-import requests
-from bs4 import BeautifulSoup
+import orjson
 import re
 
 from app.vector_store import get_vector_store
@@ -23,7 +24,67 @@ def get_embeddings() -> OpenAIEmbeddings:
         _embeddings = OpenAIEmbeddings(openai_api_key=get_openai_api_key())
     return _embeddings
 
-def extract_recipe_content(url: str) -> str:
+# JSON-LD blocks are found by scanning the raw bytes; no DOM is built
+_JSON_LD_RE = re.compile(
+    rb'<script[^>]*type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Recipe JSON-LD is almost always in <head>, so page downloads stop once it is found
+# and never read more than this many bytes
+_MAX_HTML_BYTES = 1024 * 1024
+
+# Global HTTP client for recipe page fetches (pooled connections, HTTP/2)
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the global HTTP client used to fetch recipe pages."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            }
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the global HTTP client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+async def extract_recipe_json_ld(url: str) -> Dict[str, Any]:
+    """
+    Fetch a web page and return its JSON-LD Recipe object.
+    
+    Args:
+        url: The URL of the recipe page
+        
+    Returns:
+        The JSON-LD Recipe object
+        
+    Raises:
+        ValueError: If the page has no JSON-LD recipe data
+        httpx.HTTPError: If the page could not be fetched
+    """
+    logger.info(f"Extracting recipe content from: {url}")
+    
+    # Stream the webpage without blocking the event loop, stopping at the recipe
+    json_ld_data = await _stream_json_ld_recipe(url)
+    if json_ld_data is None:
+        logger.warning("No JSON-LD recipe data found")
+        raise ValueError(f"No JSON-LD recipe data found on {url}. This tool requires structured recipe data.")
+    
+    logger.info("Found JSON-LD recipe data, using structured extraction")
+    return json_ld_data
+
+async def extract_recipe_content(url: str) -> str:
     """
     Extract recipe content from a web URL, requiring JSON-LD structured data.
     
@@ -34,68 +95,60 @@ def extract_recipe_content(url: str) -> str:
         Extracted recipe text content from JSON-LD, or error message if not found
     """
     try:
-        logger.info(f"Extracting recipe content from: {url}")
-        
-        # Fetch the webpage
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract JSON-LD structured data
-        json_ld_data = extract_json_ld_recipe(soup)
-        if json_ld_data:
-            logger.info("Found JSON-LD recipe data, using structured extraction")
-            return json_ld_data
-        else:
-            logger.warning("No JSON-LD recipe data found")
-            return f"Error: No JSON-LD recipe data found on {url}. This tool requires structured recipe data."
-        
+        json_ld_data = await extract_recipe_json_ld(url)
+        return format_recipe_from_json_ld(json_ld_data)
+    except ValueError as e:
+        return f"Error: {e}"
     except Exception as e:
         logger.error(f"Error extracting recipe content from {url}: {e}")
         return f"Error: Failed to extract recipe content from {url}: {str(e)}"
 
-def extract_json_ld_recipe(soup: BeautifulSoup) -> str:
+async def _stream_json_ld_recipe(url: str) -> Optional[Dict[str, Any]]:
     """
-    Extract recipe information from JSON-LD structured data.
+    Download a page incrementally and return its JSON-LD Recipe object as soon as it arrives.
     
     Args:
-        soup: BeautifulSoup object of the webpage
+        url: The URL of the recipe page
         
     Returns:
-        Formatted recipe content from JSON-LD data
+        The JSON-LD Recipe object, or None if none was found within the size cap
     """
+    html = bytearray()
+    scan_from = 0
+    async with get_http_client().stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            # Only rescan when a script block may have just closed
+            tail_start = max(len(html) - 8, 0)
+            html += chunk
+            if b'</script' in html[tail_start:] or b'</SCRIPT' in html[tail_start:]:
+                for match in _JSON_LD_RE.finditer(html, scan_from):
+                    scan_from = match.end()
+                    recipe = _recipe_from_json_ld_block(match.group(1))
+                    if recipe is not None:
+                        return recipe
+            if len(html) >= _MAX_HTML_BYTES:
+                logger.warning(f"Stopped reading {url} after {len(html)} bytes without JSON-LD recipe data")
+                break
+    return None
+
+def _recipe_from_json_ld_block(block: bytes) -> Optional[Dict[str, Any]]:
+    """Parse one JSON-LD script body and return its Recipe object, if any."""
     try:
-        # Find all script tags with JSON-LD
-        json_ld_scripts = soup.find_all('script', type='application/ld+json')
-        
-        for script in json_ld_scripts:
-            try:
-                import json
-                data = json.loads(script.string)
-                
-                # Handle both single objects and arrays
-                if isinstance(data, list):
-                    # Look for recipe objects in the array
-                    for item in data:
-                        if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                            return format_recipe_from_json_ld(item)
-                elif isinstance(data, dict) and data.get('@type') == 'Recipe':
-                    return format_recipe_from_json_ld(data)
-                    
-            except (json.JSONDecodeError, AttributeError) as e:
-                logger.warning(f"Error parsing JSON-LD script: {e}")
-                continue
-        
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error extracting JSON-LD recipe data: {e}")
+        data = orjson.loads(block)
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Error parsing JSON-LD script: {e}")
         return None
+    
+    # Handle both single objects and arrays
+    if isinstance(data, list):
+        # Look for recipe objects in the array
+        for item in data:
+            if isinstance(item, dict) and item.get('@type') == 'Recipe':
+                return item
+    elif isinstance(data, dict) and data.get('@type') == 'Recipe':
+        return data
+    return None
 
 def format_recipe_from_json_ld(recipe_data: dict) -> str:
     """
@@ -155,6 +208,24 @@ def format_recipe_from_json_ld(recipe_data: dict) -> str:
         logger.error(f"Error formatting recipe from JSON-LD: {e}")
         return None
 
+def instruction_texts(recipe_data: dict) -> List[str]:
+    """Flatten JSON-LD recipeInstructions (strings, HowToSteps, HowToSections) into step texts."""
+    instructions = recipe_data.get("recipeInstructions", [])
+    if isinstance(instructions, str):
+        instructions = [instructions]
+    
+    steps = []
+    for instruction in instructions:
+        if isinstance(instruction, dict):
+            # HowToSection groups its steps under itemListElement
+            for item in instruction.get("itemListElement") or [instruction]:
+                text = item.get("text", "") if isinstance(item, dict) else str(item)
+                if text.strip():
+                    steps.append(text.strip())
+        elif str(instruction).strip():
+            steps.append(str(instruction).strip())
+    return steps
+
 @tool
 def search_recipes(query: str) -> List[Dict[str, Any]]:
     """
@@ -210,7 +281,7 @@ def get_similar_recipes(recipe_id: str) -> List[Dict[str, Any]]:
         return []
 
 @tool
-def find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]]:
+async def find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]]:
     """
     Find recipes similar to a recipe from a web URL by extracting its content and searching the database.
     
@@ -223,16 +294,25 @@ def find_similar_recipes_from_url(recipe_url: str) -> List[Dict[str, Any]]:
     try:
         logger.info(f"Finding similar recipes for URL: {recipe_url}")
         
+        # A recipe already stored from this URL is recommended from its stored vector,
+        # skipping the fetch, parse, and embedding
+        vector_store = get_vector_store()
+        stored_id = await asyncio.to_thread(vector_store.get_recipe_id_by_link, recipe_url)
+        if stored_id is not None:
+            similar_recipes = await asyncio.to_thread(vector_store.get_similar_recipes, stored_id, limit=5)
+            if similar_recipes:
+                return similar_recipes
+            # Recommend failed or found nothing; fall back to embedding the page
+        
         # Extract recipe content from the URL
-        recipe_content = extract_recipe_content(recipe_url)
+        recipe_content = await extract_recipe_content(recipe_url)
         
         # Get embeddings for the recipe content
         embeddings = get_embeddings()
-        recipe_vector = embeddings.embed_query(recipe_content)
+        recipe_vector = await embeddings.aembed_query(recipe_content)
         
         # Search the vector store for similar recipes
-        vector_store = get_vector_store()
-        similar_recipes = vector_store.search_recipes(recipe_vector, limit=5)
+        similar_recipes = await asyncio.to_thread(vector_store.search_recipes, recipe_vector, limit=5)
         
         logger.info(f"Found {len(similar_recipes)} similar recipes for URL: {recipe_url}")
         return similar_recipes
@@ -262,18 +342,25 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
     try:
         logger.info(f"Starting complete recipe extraction workflow for URL: {url}")
         
-        # Step 1: Extract recipe content from the URL
-        recipe_content = extract_recipe_content(url)
-        
-        if recipe_content.startswith("Error:"):
+        # Step 1: Extract the JSON-LD recipe from the URL
+        try:
+            json_ld_data = await extract_recipe_json_ld(url)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": f"Error: {e}",
+                "url": url
+            }
+        except Exception as e:
+            logger.error(f"Error extracting recipe content from {url}: {e}")
             return {
                 "success": False,
-                "error": recipe_content,
+                "error": f"Error: Failed to extract recipe content from {url}: {str(e)}",
                 "url": url
             }
         
-        # Step 2: Parse the extracted content to get structured recipe data
-        recipe_data = parse_recipe_content(recipe_content, url)
+        # Step 2: Map the JSON-LD fields straight to structured recipe data
+        recipe_data = recipe_from_json_ld(json_ld_data, url)
         
         # Step 3: Enrich recipe data with AI
         try:
@@ -282,28 +369,37 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
             logger.warning(f"AI enrichment failed, using original data: {e}")
             enriched_data = recipe_data
         
-        # Step 4: Store recipe in MongoDB
-        try:
-            from app.mongo import get_recipe_service
-            recipe_service = get_recipe_service()
-            
-            # Check if recipe already exists
-            existing_recipe = await recipe_service.get_recipe_by_url(url)
-            if existing_recipe:
-                logger.info(f"Recipe already exists in database: {existing_recipe['_id']}")
-                mongo_id = existing_recipe['_id']
-            else:
+        # Steps 4 and 5 both only need the enriched data, so run them concurrently
+        async def store_in_mongo() -> Optional[str]:
+            try:
+                from app.mongo import get_recipe_service
+                recipe_service = get_recipe_service()
+                
+                # Check if recipe already exists
+                existing_recipe = await recipe_service.get_recipe_by_url(url)
+                if existing_recipe:
+                    logger.info(f"Recipe already exists in database: {existing_recipe['_id']}")
+                    return existing_recipe['_id']
+                
                 # Add recipe to MongoDB
                 mongo_id = await recipe_service.add_recipe(enriched_data)
                 logger.info(f"Added recipe to MongoDB with ID: {mongo_id}")
-        except Exception as e:
-            logger.error(f"Failed to store recipe in MongoDB: {e}")
-            # Continue with vector store even if MongoDB fails
-            mongo_id = None
+                return mongo_id
+            except Exception as e:
+                logger.error(f"Failed to store recipe in MongoDB: {e}")
+                # Continue with vector store even if MongoDB fails
+                return None
         
+        # Step 4: Store recipe in MongoDB
         # Step 5: Generate embeddings for the recipe summary
         embeddings = get_embeddings()
-        recipe_vector = embeddings.embed_query(enriched_data.get("summary", recipe_content))
+        mongo_id, recipe_vector = await asyncio.gather(
+            store_in_mongo(),
+            # The textual form is only built if there is no summary to embed
+            embeddings.aembed_query(
+                enriched_data.get("summary") or format_recipe_from_json_ld(json_ld_data)
+            )
+        )
         
         # Step 6: Add recipe to vector store
         vector_store = get_vector_store()
@@ -312,7 +408,7 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
         if mongo_id:
             enriched_data['mongo_id'] = mongo_id
         
-        vector_id = vector_store.add_recipe(enriched_data, recipe_vector)
+        vector_id = await asyncio.to_thread(vector_store.add_recipe, enriched_data, recipe_vector)
         
         logger.info(f"Successfully completed recipe extraction workflow")
         logger.info(f"  - MongoDB ID: {mongo_id}")
@@ -340,109 +436,78 @@ async def extract_and_store_recipe(url: str) -> Dict[str, Any]:
             "url": url
         }
 
-def parse_recipe_content(recipe_content: str, url: str) -> Dict[str, Any]:
+def recipe_from_json_ld(recipe_data: Dict[str, Any], url: str) -> Dict[str, Any]:
     """
-    Parse extracted recipe content into structured data conforming to RecipeVector schema.
+    Map a JSON-LD Recipe object to structured data conforming to RecipeVector schema.
     
     Args:
-        recipe_content: The extracted recipe content
+        recipe_data: The JSON-LD Recipe object
         url: The source URL
         
     Returns:
         Structured recipe data dictionary
     """
-    try:
-        import json
-        from datetime import datetime
-        
-        # Try to parse as JSON-LD first
-        try:
-            recipe_data = json.loads(recipe_content)
-            if isinstance(recipe_data, dict) and recipe_data.get("@type") == "Recipe":
-                # Extract tools from recipe instructions
-                tools = extract_tools_from_recipe(recipe_data)
-                
-                # Extract keywords from title and description
-                keywords = extract_keywords_from_recipe(recipe_data)
-                
-                return {
-                    "title": recipe_data.get("name", "Unknown Recipe"),
-                    "summary": recipe_data.get("description", ""),
-                    "link": url,
-                    "source": extract_domain(url),
-                    "ingredients": [ingredient.get("name", "") for ingredient in recipe_data.get("recipeIngredient", [])],
-                    "prep_time": recipe_data.get("prepTime", ""),
-                    "cook_time": recipe_data.get("cookTime", ""),
-                    "servings": recipe_data.get("recipeYield", ""),
-                    "cuisine": recipe_data.get("recipeCuisine", ""),
-                    "category": recipe_data.get("recipeCategory", ""),
-                    "rating": recipe_data.get("aggregateRating", {}).get("ratingValue", ""),
-                    "rating_count": recipe_data.get("aggregateRating", {}).get("reviewCount", ""),
-                    "image_url": recipe_data.get("image", {}).get("url", "") if isinstance(recipe_data.get("image"), dict) else recipe_data.get("image", ""),
-                    "tools": tools,
-                    "keywords": keywords,
-                    "created_at": datetime.now().isoformat()
-                }
-        except (json.JSONDecodeError, KeyError):
-            pass
-        
-        # Fallback: create basic structure from text content
-        return {
-            "title": "Extracted Recipe",
-            "summary": recipe_content[:500] + "..." if len(recipe_content) > 500 else recipe_content,
-            "link": url,
-            "source": extract_domain(url),
-            "ingredients": [],
-            "prep_time": "",
-            "cook_time": "",
-            "servings": "",
-            "cuisine": "",
-            "category": "",
-            "rating": "",
-            "rating_count": "",
-            "image_url": "",
-            "tools": [],
-            "keywords": [],
-            "created_at": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Error parsing recipe content: {e}")
-        return {
-            "title": "Extracted Recipe",
-            "summary": recipe_content,
-            "link": url,
-            "source": extract_domain(url),
-            "tools": [],
-            "keywords": [],
-            "created_at": datetime.now().isoformat()
-        }
+    from datetime import datetime
+    
+    # Extract tools from recipe instructions
+    tools = extract_tools_from_recipe(recipe_data)
+    
+    # Extract keywords from title and description
+    keywords = extract_keywords_from_recipe(recipe_data)
+    
+    # recipeIngredient is normally a list of strings, occasionally of objects
+    ingredients = recipe_data.get("recipeIngredient", [])
+    if isinstance(ingredients, str):
+        ingredients = [ingredients]
+    ingredients = [
+        ingredient.get("name", "") if isinstance(ingredient, dict) else str(ingredient)
+        for ingredient in ingredients
+    ]
+    
+    rating = recipe_data.get("aggregateRating") or {}
+    image = recipe_data.get("image", "")
+    if isinstance(image, list):
+        image = image[0] if image else ""
+    
+    return {
+        "title": recipe_data.get("name", "Unknown Recipe"),
+        "summary": recipe_data.get("description", ""),
+        "link": url,
+        "source": extract_domain(url),
+        "ingredients": ingredients,
+        "prep_time": recipe_data.get("prepTime", ""),
+        "cook_time": recipe_data.get("cookTime", ""),
+        "servings": recipe_data.get("recipeYield", ""),
+        "cuisine": recipe_data.get("recipeCuisine", ""),
+        "category": recipe_data.get("recipeCategory", ""),
+        "rating": rating.get("ratingValue", ""),
+        "rating_count": rating.get("reviewCount", ""),
+        "image_url": image.get("url", "") if isinstance(image, dict) else image,
+        "tools": tools,
+        "keywords": keywords,
+        "created_at": datetime.now().isoformat()
+    }
+
+# Tools looked for in recipe instructions
+COMMON_TOOLS = [
+    "oven", "stovetop", "microwave", "blender", "food processor", 
+    "mixer", "grill", "slow cooker", "instant pot", "air fryer",
+    "sheet pan", "baking dish", "skillet", "pot", "pan", "bowl",
+    "knife", "cutting board", "measuring cups", "spatula", "whisk"
+]
+
+# One regex pass finds every tool; the lookahead matches at each position without consuming
+# text, so tools inside longer names ("pot" in "instant pot") are still found
+_COMMON_TOOLS_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(COMMON_TOOLS, key=len, reverse=True))) + "))"
+)
 
 def extract_tools_from_recipe(recipe_data: dict) -> list:
     """Extract cooking tools from recipe data."""
-    tools = []
-    common_tools = [
-        "oven", "stovetop", "microwave", "blender", "food processor", 
-        "mixer", "grill", "slow cooker", "instant pot", "air fryer",
-        "sheet pan", "baking dish", "skillet", "pot", "pan", "bowl",
-        "knife", "cutting board", "measuring cups", "spatula", "whisk"
-    ]
-    
     # Check recipe instructions for tools
-    instructions = recipe_data.get("recipeInstructions", [])
-    if isinstance(instructions, list):
-        for instruction in instructions:
-            if isinstance(instruction, dict):
-                text = instruction.get("text", "")
-            else:
-                text = str(instruction)
-            
-            text_lower = text.lower()
-            for tool in common_tools:
-                if tool in text_lower:
-                    tools.append(tool)
-    
-    return list(set(tools))  # Remove duplicates
+    # Lowercased once and deduplicated, since repeated steps can't add tools
+    text = "\n".join(dict.fromkeys(instruction_texts(recipe_data))).lower()
+    return list(set(_COMMON_TOOLS_RE.findall(text)))  # Remove duplicates
 
 def extract_keywords_from_recipe(recipe_data: dict) -> list:
     """Extract keywords from recipe title and description."""
@@ -621,12 +686,18 @@ def search_recipes_with_web_context(query: str) -> List[Dict[str, Any]]:
         logger.error(f"Error in search_recipes_with_web_context: {e}")
         return []
 
+# Built once so every caller gets the same (identity-stable) list
+_available_tools: Optional[List] = None
+
 def get_available_tools() -> List:
     """Get all available tools for the agent."""
-    return [
-        search_recipes, 
-        get_similar_recipes, 
-        find_similar_recipes_from_url,
-        search_recipes_with_web_context,
-        extract_and_store_recipe
-    ] 
\ No newline at end of file
+    global _available_tools
+    if _available_tools is None:
+        _available_tools = [
+            search_recipes, 
+            get_similar_recipes, 
+            find_similar_recipes_from_url,
+            search_recipes_with_web_context,
+            extract_and_store_recipe
+        ]
+    return _available_tools 
\ No newline at end of file
@@ -2,17 +2,34 @@
 
 from typing import List, Dict, Any, Optional
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance, ExtendedPointId, VectorParams, PointStruct, Filter, HasIdCondition, FieldCondition, MatchValue,
+    PayloadSchemaType,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    SearchParams, QuantizationSearchParams
+)
+from qdrant_client.http.exceptions import UnexpectedResponse
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
+# Payload fields read by _to_recipe; searches fetch only these from Qdrant
+_RESULT_PAYLOAD_FIELDS = ["title", "summary", "link"]
+
+def normalize_vector(vector: List[float]) -> List[float]:
+    """L2-normalize a vector so dot product equals cosine similarity."""
+    norm = math.hypot(*vector)
+    if norm == 0:
+        return list(vector)
+    return [x / norm for x in vector]
+
 class RecipeVectorStore:
     """Handles vector operations for recipe search."""
     
-    def __init__(self, url: str, api_key: Optional[str] = None):
+    def __init__(self, url: str, api_key: Optional[str] = None, prefer_grpc: bool = False):
         """Initialize Qdrant client."""
-        self.client = QdrantClient(url=url, api_key=api_key)
+        self.client = QdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc)
         self.collection_name = "recipes"
         self._ensure_collection_exists()
     
@@ -25,7 +42,13 @@ class RecipeVectorStore:
             if self.collection_name not in collection_names:
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
+                    # Vectors are normalized before they reach Qdrant, so Dot equals Cosine
+                    # without Qdrant normalizing on every search
+                    vectors_config=VectorParams(size=1536, distance=Distance.DOT),
+                    # int8 copies kept in RAM for traversal; originals are used to rescore
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                    )
                 )
                 logger.info(f"Created collection: {self.collection_name}")
             else:
@@ -33,26 +56,43 @@ class RecipeVectorStore:
         except Exception as e:
             logger.error(f"Error ensuring collection exists: {e}")
             raise
+        
+        try:
+            # Keyword index so source-URL lookups don't scan every payload
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name="link",
+                field_schema=PayloadSchemaType.KEYWORD
+            )
+        except Exception as e:
+            logger.warning(f"Error ensuring link payload index: {e}")
     
-    def search_recipes(self, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for recipes using a query vector."""
+    def search_recipes(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        exclude_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for recipes using a query vector, optionally excluding recipes by ID."""
         try:
+            query_filter = None
+            if exclude_ids:
+                # Exclude inside Qdrant so the caller still gets `limit` results
+                query_filter = Filter(must_not=[HasIdCondition(has_id=exclude_ids)])
+            
             search_result = self.client.search(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
+                query_vector=normalize_vector(query_vector),
+                query_filter=query_filter,
+                with_payload=_RESULT_PAYLOAD_FIELDS,
+                # Rescore the oversampled quantized candidates against the original vectors
+                search_params=SearchParams(
+                    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+                ),
                 limit=limit
             )
             
-            recipes = []
-            for result in search_result:
-                recipe = {
-                    "id": result.id,
-                    "title": result.payload.get("title", ""),
-                    "summary": result.payload.get("summary", ""),
-                    "url": result.payload.get("link", ""),
-                    "score": result.score
-                }
-                recipes.append(recipe)
+            recipes = [self._to_recipe(result) for result in search_result]
             
             logger.info(f"Found {len(recipes)} recipes for query")
             return recipes
@@ -84,18 +124,46 @@ class RecipeVectorStore:
             logger.error(f"Error retrieving recipe {recipe_id}: {e}")
             return None
     
-    def get_similar_recipes(self, recipe_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def get_recipe_id_by_link(self, link: str) -> Optional[ExtendedPointId]:
+        """Get the ID of the stored recipe with the given source URL, if any."""
+        try:
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=Filter(must=[FieldCondition(key="link", match=MatchValue(value=link))]),
+                limit=1,
+                with_payload=False,
+                with_vectors=False
+            )
+            # Keep the ID's own type: recommend() treats "12345" and 12345 as different points
+            return points[0].id if points else None
+            
+        except Exception as e:
+            logger.error(f"Error looking up recipe by link {link}: {e}")
+            return None
+    
+    def get_similar_recipes(self, recipe_id: ExtendedPointId, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recipes similar to a given recipe ID."""
         try:
-            # First get the recipe vector
-            recipe = self.get_recipe_by_id(recipe_id)
-            if not recipe or not recipe.get("vector"):
-                logger.warning(f"Recipe {recipe_id} not found or has no vector")
-                return []
+            # Recommend uses the stored vector server-side and leaves out the
+            # positive example itself, so there is no retrieve round trip
+            search_result = self.client.recommend(
+                collection_name=self.collection_name,
+                positive=[recipe_id],
+                with_payload=_RESULT_PAYLOAD_FIELDS,
+                search_params=SearchParams(
+                    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+                ),
+                limit=limit
+            )
             
-            # Search for similar recipes
-            return self.search_recipes(recipe["vector"], limit)
+            return [self._to_recipe(result) for result in search_result]
             
+        except UnexpectedResponse as e:
+            if e.status_code == 404:
+                logger.warning(f"Recipe {recipe_id} not found in vector store")
+            else:
+                logger.error(f"Error getting similar recipes for {recipe_id}: {e}")
+            return []
         except Exception as e:
             logger.error(f"Error getting similar recipes for {recipe_id}: {e}")
             return []
@@ -135,7 +203,7 @@ class RecipeVectorStore:
             # Create the point structure conforming to RecipeVector schema
             point = PointStruct(
                 id=recipe_id,
-                vector=recipe_vector,
+                vector=normalize_vector(recipe_vector),
                 payload={
                     "mongo_id": recipe_id,  # Using recipe_id as mongo_id for now
                     "title": recipe_data.get("title", ""),
@@ -174,6 +242,17 @@ class RecipeVectorStore:
             logger.error(f"Error adding recipe to vector store: {e}")
             raise
 
+    @staticmethod
+    def _to_recipe(result) -> Dict[str, Any]:
+        """Map a scored Qdrant point to the recipe dict returned by searches."""
+        return {
+            "id": result.id,
+            "title": result.payload.get("title", ""),
+            "summary": result.payload.get("summary", ""),
+            "url": result.payload.get("link", ""),
+            "score": result.score
+        }
+
     def _parse_time_to_minutes(self, time_str: str) -> int:
         """Parse time string to minutes."""
         if not time_str:
@@ -258,9 +337,10 @@ def get_vector_store() -> RecipeVectorStore:
     """Get or create the global vector store instance."""
     global _vector_store
     if _vector_store is None:
-        from app.config import get_vector_db_url, get_vector_db_api_key
+        from app.config import get_vector_db_url, get_vector_db_api_key, get_vector_db_prefer_grpc
         _vector_store = RecipeVectorStore(
             url=get_vector_db_url(),
-            api_key=get_vector_db_api_key()
+            api_key=get_vector_db_api_key(),
+            prefer_grpc=get_vector_db_prefer_grpc()
         )
     return _vector_store 
\ No newline at end of file
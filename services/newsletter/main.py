@@ -3,14 +3,9 @@
 import uvicorn
 import logging
 from app.api import app
-from app.config import HOST, PORT, DEBUG
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG if DEBUG else logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from app.config import HOST, PORT, DEBUG, LOG_LEVEL
 
+# Logging is configured by app.api (LOG_LEVEL, queued handler)
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
@@ -22,5 +17,9 @@ if __name__ == "__main__":
         host=HOST,
         port=PORT,
         reload=DEBUG,
-        log_level="debug" if DEBUG else "info"
+        log_level=LOG_LEVEL.lower(),
+        # uvloop and httptools come with uvicorn[standard]; pin them rather than
+        # silently falling back to the pure-Python loop and parser
+        loop="uvloop",
+        http="httptools"
     ) 
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""Unit tests for the Redis-backed caches."""
+
+import asyncio
+import orjson
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.cache import ChatHistoryCache, SemanticCache
+
+
+@pytest.fixture
+def mock_redis():
+    """Fixture for a mocked async Redis client."""
+    client = Mock()
+    client.get = AsyncMock(return_value=None)
+    client.set = AsyncMock()
+    return client
+
+
+class TestChatHistoryCache:
+    """Test cases for the chat history cache."""
+
+    def test_get_miss(self, mock_redis):
+        """Test that a missing key returns None."""
+        cache = ChatHistoryCache(mock_redis)
+
+        assert asyncio.run(cache.get("chat_1", 2)) is None
+        mock_redis.get.assert_called_once_with("chat:hist:chat_1:2")
+
+    def test_get_hit(self, mock_redis):
+        """Test that a cached history is decoded."""
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+        mock_redis.get.return_value = orjson.dumps(history)
+        cache = ChatHistoryCache(mock_redis)
+
+        assert asyncio.run(cache.get("chat_1", 2)) == history
+
+    def test_set_is_keyed_by_message_count(self, mock_redis):
+        """Test that histories are stored under their message count with the TTL."""
+        history = [{"role": "user", "content": "Hi"}]
+        cache = ChatHistoryCache(mock_redis, ttl=30)
+
+        asyncio.run(cache.set("chat_1", 1, history))
+
+        mock_redis.set.assert_called_once_with("chat:hist:chat_1:1", orjson.dumps(history), ex=30)
+
+    def test_get_error_is_a_miss(self, mock_redis):
+        """Test that Redis errors are treated as a miss."""
+        mock_redis.get.side_effect = Exception("Connection refused")
+        cache = ChatHistoryCache(mock_redis)
+
+        assert asyncio.run(cache.get("chat_1", 2)) is None
+
+
+class TestSemanticCache:
+    """Test cases for the semantic response cache."""
+
+    def _cache_with_result(self, mock_redis, distance):
+        """Build a cache whose index returns one document at the given distance."""
+        doc = Mock(distance=str(distance), response=b"Try these tacos")
+        index = Mock()
+        index.search = AsyncMock(return_value=Mock(docs=[doc]))
+        mock_redis.ft = Mock(return_value=index)
+        cache = SemanticCache(mock_redis, max_distance=0.05)
+        cache._index_ready = True
+        return cache
+
+    def test_lookup_hit_within_distance(self, mock_redis):
+        """Test that a close enough prompt returns the cached response."""
+        cache = self._cache_with_result(mock_redis, 0.01)
+
+        assert asyncio.run(cache.lookup([0.1] * 1536)) == "Try these tacos"
+
+    def test_lookup_miss_beyond_distance(self, mock_redis):
+        """Test that a distant prompt misses."""
+        cache = self._cache_with_result(mock_redis, 0.2)
+
+        assert asyncio.run(cache.lookup([0.1] * 1536)) is None